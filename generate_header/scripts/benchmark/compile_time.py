@@ -0,0 +1,98 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Compares the downstream compile time of the full converted header against a tree-shaken header holding only the
+elements a consumer refers to, by default the C gain test plugin.
+
+Both headers are compiled on their own and together with the consumer, the median of all repetitions is reported.
+The consumer only compiles if the header was converted from the full pluginterfaces tree, run it on the header
+compilation of the SDK to get representative numbers. The compiler is taken from the CC environment variable.
+
+usage (from the scripts directory): python -m benchmark.compile_time [header] [consumer] [repetitions] [clang-args*]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from interface_convert import create_translation_unit, ConversionSession
+from subset_convert import create_subset, find_referenced_names
+
+
+def _compile(compiler: str, source_path: Path, include_path: Path) -> bool:
+    return subprocess.run([compiler, '-fsyntax-only', '-x', 'c', '-I', str(include_path), str(source_path)],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def measure_compile(compiler: str, source_path: Path, include_path: Path, repetitions: int) -> dict:
+    durations = []
+    succeeded = True
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        succeeded = _compile(compiler, source_path, include_path) and succeeded
+        durations.append(time.perf_counter() - start_time)
+    return {'seconds': statistics.median(durations), 'succeeded': succeeded}
+
+
+def _measure_header(session: ConversionSession, directory: Path, consumer_path: Path, compiler: str,
+                    repetitions: int) -> dict:
+    directory.mkdir()
+    header_path = directory / 'vst3_c_api.h'
+    with header_path.open('w') as header_file:
+        session.write_conversion(header_file)
+    include_path = directory / 'include_only.c'
+    include_path.write_text('#include "vst3_c_api.h"\n')
+    return {
+        'bytes': header_path.stat().st_size,
+        'interfaces': len(session.interfaces),
+        'structs': len(session.structs),
+        'header': measure_compile(compiler, include_path, directory, repetitions),
+        'consumer': measure_compile(compiler, consumer_path, directory, repetitions)
+    }
+
+
+def measure(header_path: Path, consumer_path: Path, clang_args=None, repetitions: int = 10) -> dict:
+    translation_unit = create_translation_unit(header_path, str(header_path.parents[2]), clang_args)
+    session = ConversionSession()
+    session.parse_header(translation_unit.cursor)
+    selection = find_referenced_names(session, consumer_path.read_text())
+    compiler = os.environ.get('CC', 'cc')
+    with tempfile.TemporaryDirectory() as directory:
+        return {
+            'selection': len(selection),
+            'full': _measure_header(session, Path(directory) / 'full', consumer_path, compiler, repetitions),
+            'subset': _measure_header(create_subset(session, selection), Path(directory) / 'subset', consumer_path,
+                                      compiler, repetitions)
+        }
+
+
+def _print_results(results: dict, prefix: str = ''):
+    for name, value in results.items():
+        if isinstance(value, dict):
+            _print_results(value, prefix + name + '.')
+        else:
+            print('{}{}: {}'.format(prefix, name, round(value, 6) if isinstance(value, float) else value))
+
+
+def main():
+    scripts_path = Path(__file__).parents[1]
+    header_path = Path(sys.argv[1] if len(sys.argv) > 1 else scripts_path / 'test' / 'headers' /
+                       'compilation.h').absolute()
+    consumer_path = Path(sys.argv[2] if len(sys.argv) > 2 else scripts_path.parents[1] / 'c_gain_test_plugin' /
+                         'cgain.c').absolute()
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    _print_results(measure(header_path, consumer_path, sys.argv[4:], repetitions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Counts cursor kind reads and libclang calls per visited cursor while parsing a header, along with the hit rate of
+the type conversion cache and the parse time, for the kind-keyed dispatch of the session and the baseline walker
+it replaced.
+
+The baseline walker tries every kind-guarded parse function on every cursor, just like the walker before the
+dispatch tables. Struct and enum children are parsed by the same code for both. The per translation unit caches
+are dropped before every parse, so every repetition runs with cold caches, as a single conversion does.
+
+The dispatch saves cursor kind reads, not libclang calls: the kind of a cursor is a field of the ctypes structure
+which is read without calling libclang, and both walkers hand each cursor to the same handlers, which make the same
+libclang calls. Both savings are printed, the libclang calls saved per cursor are expected to be zero.
+
+usage (from the scripts directory): python -m benchmark.dispatch [header] [repetitions] [clang-args*]
+"""
+
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from clang.cindex import Cursor, conf
+
+from clang_helpers import invalidate_caches, is_kind, is_not_kind
+from data_classes import Interface
+from interface_convert import create_translation_unit, ConversionSession, get_type_converter, store_typedefs, \
+    parse_methods, convert_cursor, get_cursor_location
+
+
+class _CountingLibrary:
+    """forwards all functions of the libclang library and counts their calls"""
+
+    def __init__(self, library, counter: Counter):
+        self._library = library
+        self._counter = counter
+
+    def __getattr__(self, name):
+        function = getattr(self._library, name)
+        counter = self._counter
+
+        def counting_function(*args):
+            counter[name] += 1
+            return function(*args)
+
+        return counting_function
+
+
+def _parse_class_baseline(session: ConversionSession, cursor: Cursor):
+    if is_not_kind(cursor, 'CLASS_DECL') or cursor.spelling in session.blocklist:
+        return
+    children = list(cursor.get_children())
+    if not children:
+        return
+    interface = Interface(convert_cursor(cursor), get_cursor_location(cursor.location), cursor.brief_comment)
+    for cursor_child in children:
+        store_typedefs(cursor_child, session.interface_typedefs)
+        session.parse_enum(cursor_child)
+        session.parse_inheritance(cursor_child, interface)
+        session.parse_variables(cursor_child)
+        parse_methods(cursor_child, interface)
+    session.interfaces.append(interface)
+
+
+def _parse_baseline(session: ConversionSession, cursor: Cursor, namespace: str = ''):
+    if is_kind(cursor, 'NAMESPACE'):
+        namespace = '{}::{}'.format(namespace, cursor.spelling) if namespace else cursor.spelling
+        for cursor_child in cursor.get_children():
+            _parse_baseline(session, cursor_child, namespace)
+        return
+    _parse_class_baseline(session, cursor)
+    session.parse_enum(cursor)
+    session.parse_structs(cursor)
+    session.parse_iid(cursor, namespace)
+    store_typedefs(cursor, session.typedefs)
+    session.parse_variables(cursor)
+
+
+def parse_header_baseline(session: ConversionSession, cursor: Cursor):
+    """parses a translation unit with the baseline walker, the includes are selected like parse_header does"""
+    session._dispatch = lambda cursor_child, namespace='': _parse_baseline(session, cursor_child, namespace)
+    try:
+        session.parse_header(cursor)
+    finally:
+        del session._dispatch
+
+
+def _parse_dispatch(session: ConversionSession, cursor: Cursor):
+    session.parse_header(cursor)
+
+
+walkers = {'dispatch': _parse_dispatch, 'baseline': parse_header_baseline}
+
+
+def _count(translation_unit, walker) -> dict:
+    counter = Counter()
+    visited_cursors = set()
+    library = conf.lib
+    kind_property = Cursor.kind
+    get_children = Cursor.get_children
+
+    def counting_kind(cursor):
+        counter['kind'] += 1
+        return kind_property.fget(cursor)
+
+    def counting_get_children(cursor):
+        children = list(get_children(cursor))
+        visited_cursors.update(library.clang_hashCursor(child) for child in children)
+        return iter(children)
+
+    invalidate_caches(translation_unit)
+    session = ConversionSession()
+    conf.lib = _CountingLibrary(library, counter)
+    Cursor.kind = property(counting_kind)
+    Cursor.get_children = counting_get_children
+    try:
+        walker(session, translation_unit.cursor)
+    finally:
+        conf.lib = library
+        Cursor.kind = kind_property
+        Cursor.get_children = get_children
+    type_converter = get_type_converter(translation_unit)
+    type_conversions = type_converter.hits + type_converter.misses
+    library_calls = sum(count for name, count in counter.items() if name.startswith('clang_'))
+    return {
+        'cursors': len(visited_cursors),
+        'kind_reads_per_cursor': counter['kind'] / len(visited_cursors),
+        'libclang_calls_per_cursor': library_calls / len(visited_cursors),
+        'type_conversion_hit_rate': type_converter.hits / type_conversions if type_conversions else 0.0,
+        'output': session.generate_conversion()
+    }
+
+
+def _time(translation_unit, walker, repetitions: int) -> float:
+    duration = 0.0
+    for _ in range(repetitions):
+        invalidate_caches(translation_unit)
+        session = ConversionSession()
+        start_time = time.perf_counter()
+        walker(session, translation_unit.cursor)
+        duration += time.perf_counter() - start_time
+    return duration / repetitions
+
+
+def measure(header_path: Path, clang_args=None, repetitions: int = 20) -> dict:
+    translation_unit = create_translation_unit(header_path, str(header_path.parents[2]), clang_args)
+    results = {}
+    outputs = []
+    for name, walker in walkers.items():
+        result = _count(translation_unit, walker)
+        outputs.append(result.pop('output'))
+        result['parse_seconds'] = _time(translation_unit, walker, repetitions)
+        results[name] = result
+    for name in ['kind_reads_per_cursor', 'libclang_calls_per_cursor']:
+        results[name.replace('_per_cursor', '_saved_per_cursor')] = results['baseline'][name] - \
+                                                                     results['dispatch'][name]
+    # both walkers must build the same model, otherwise the comparison is meaningless
+    results['same_output'] = all(output == outputs[0] for output in outputs)
+    return results
+
+
+def _print_results(results: dict, prefix: str = ''):
+    for name, value in results.items():
+        if isinstance(value, dict):
+            _print_results(value, prefix + name + '.')
+        else:
+            print('{}{}: {}'.format(prefix, name, round(value, 6) if isinstance(value, float) else value))
+
+
+def main():
+    header_path = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parents[1] / 'test' / 'headers' /
+                       'compilation.h').absolute()
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    _print_results(measure(header_path, sys.argv[3:], repetitions))
+
+
+if __name__ == '__main__':
+    main()
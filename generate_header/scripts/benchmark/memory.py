@@ -0,0 +1,94 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Compares the memory of the parsed model against a dict-backed model holding preformatted method strings.
+
+The header is parsed once, its file records are then loaded as many times as requested, as if that many SDK
+versions were converted in one process. Run it on the header compilation of the full pluginterfaces tree to get
+representative numbers.
+
+usage (from the scripts directory): python -m benchmark.memory [header] [copies] [clang-args*]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+from data_classes import Method
+from interface_convert import create_translation_unit, ConversionSession, render_method
+from intermediate_representation import dump_file_records, load_file_records, storage_names
+
+
+class _FormattedElement:
+    """element of the dict-backed model, methods are stored as formatted C strings"""
+
+    def __init__(self, data: dict):
+        for name, value in data.items():
+            if name == 'methods':
+                value = [render_method(Method.from_dict(method)) for method in value]
+            setattr(self, '_' + name, value)
+
+
+def _load_structured(records: list) -> ConversionSession:
+    session = ConversionSession()
+    load_file_records(session, records)
+    return session
+
+
+def _load_formatted(records: list) -> dict:
+    return {name: [_FormattedElement(data) for record in records for data in record[name]] for name in storage_names}
+
+
+def _measure_model(load_function, record_copies: list) -> int:
+    """returns the peak number of bytes allocated while loading all copies"""
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    models = [load_function(records) for records in record_copies]
+    peak_size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del models
+    return peak_size - start_size
+
+
+def measure(header_path: Path, clang_args=None, copies: int = 10) -> dict:
+    translation_unit = create_translation_unit(header_path, str(header_path.parents[2]), clang_args)
+    session = ConversionSession()
+    session.parse_header(translation_unit.cursor)
+    serialized_records = json.dumps(dump_file_records(session))
+    methods = sum(len(interface.methods) for interface in session.interfaces)
+    # shared parameters are only interned while referred to, so the parse above doesn't make the copies look smaller
+    del session
+    # the session refers to itself through its handlers, so its parameters are released by the cycle collector
+    gc.collect()
+    # every copy gets its own strings, just like separately parsed SDK versions
+    structured_bytes = _measure_model(_load_structured, [json.loads(serialized_records) for _ in range(copies)])
+    # the session itself is no part of the model
+    structured_bytes -= _measure_model(lambda records: ConversionSession(), [[] for _ in range(copies)])
+    formatted_bytes = _measure_model(_load_formatted, [json.loads(serialized_records) for _ in range(copies)])
+    return {
+        'copies': copies,
+        'methods': methods,
+        'structured_bytes': structured_bytes,
+        'formatted_bytes': formatted_bytes,
+        'ratio': structured_bytes / formatted_bytes if formatted_bytes else 0.0
+    }
+
+
+def main():
+    header_path = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parents[1] / 'test' / 'headers' /
+                       'compilation.h').absolute()
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    for name, value in measure(header_path, sys.argv[3:], copies).items():
+        print('{}: {}'.format(name, round(value, 6) if isinstance(value, float) else value))
+
+
+if __name__ == '__main__':
+    main()
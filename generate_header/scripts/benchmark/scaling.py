@@ -0,0 +1,144 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Times the conversion of synthetic pluginterfaces-like headers and how it scales with their size.
+
+A synthetic header holds a number of interfaces with a number of methods each, derived from each other in chains of
+the given inheritance depth, every interface comes with a nested enum, a struct and a constant whose values are
+initializer expressions. The headers are handed to libclang as unsaved files next to the test headers, so they
+build on the FUnknown of the tests and nothing is written to disk.
+
+create_translation_unit, parse_header and generate_conversion are timed separately, the median of all repetitions
+is reported. Each repetition parses a new translation unit, so the per translation unit caches start cold. Every
+size parameter is then scaled on its own while the others keep their base value, the exponent of each curve is the
+slope between its first and last point in log-log space: about 1 for linear, about 2 for quadratic behaviour.
+
+usage (from the scripts directory): python -m benchmark.scaling [--interfaces N] [--methods M] [--depth D]
+                                    [--factors F*] [--repetitions R] [--output results.json] [clang-args*]
+"""
+
+import json
+import math
+import statistics
+import time
+from argparse import ArgumentParser, REMAINDER
+from pathlib import Path
+from typing import List
+
+from interface_convert import create_translation_unit, ConversionSession
+
+_headers_path = Path(__file__).parents[1] / 'test' / 'headers'
+_phases = ['create_translation_unit', 'parse_header', 'generate_conversion']
+
+
+def generate_header(interfaces: int, methods: int, depth: int) -> str:
+    """
+    returns a synthetic header with the given number of interfaces and methods per interface, the interfaces are
+    derived from each other in chains of depth interfaces
+    """
+    lines = ['#pragma once\n', '#include "funknown.h"\n', 'namespace Steinberg {\n',
+             'static const int32 kSyntheticBase = 16;\n']
+    for index in range(interfaces):
+        base_name = 'ISynthetic{}'.format(index - 1) if index % depth else 'FUnknown'
+        lines.append('struct SyntheticInfo{0}\n{{\n'
+                     '\tenum {{ kNameSize{0} = kSyntheticBase * 2 + {0} }};\n'
+                     '\tint32 flags;\n'
+                     '\tint8 name[kNameSize{0}];\n'
+                     '}};\n'.format(index))
+        lines.append('class ISynthetic{} : public {}\n{{\npublic:\n'.format(index, base_name))
+        for method in range(methods):
+            lines.append('\tvirtual tresult PLUGIN_API method{0}_{1} (int32 index, SyntheticInfo{0}* info, '
+                         'FUnknown* context, void** obj) = 0;\n'.format(index, method))
+        lines.append('\tenum Flags{0}\n\t{{\n\t\tkFirst{0} = 1 << 0,\n\t\tkSecond{0} = 1 << 1,\n'
+                     '\t\tkBoth{0} = kFirst{0} | kSecond{0}\n\t}};\n'.format(index))
+        lines.append('\tstatic const FUID iid;\n};\n')
+        lines.append('DECLARE_CLASS_IID (ISynthetic{0}, 0x{0:08X}, 0x12345678, 0x9ABCDEF0, 0x0FEDCBA9)\n'
+                     .format(index))
+        lines.append('static const int32 kSyntheticValue{0} = kSyntheticBase * {0} + 1;\n'.format(index))
+    lines.append('}\n')
+    return ''.join(lines)
+
+
+def measure(interfaces: int, methods: int, depth: int, clang_args: List[str] = None, repetitions: int = 5) -> dict:
+    """returns the median seconds of every conversion phase of a synthetic header along with its size"""
+    header_path = (_headers_path / 'synthetic.h').absolute()
+    unsaved_files = [(str(header_path), generate_header(interfaces, methods, depth))]
+    durations = {phase: [] for phase in _phases}
+    session = None
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]), clang_args,
+                                                   unsaved_files=unsaved_files)
+        durations['create_translation_unit'].append(time.perf_counter() - start_time)
+        session = ConversionSession()
+        start_time = time.perf_counter()
+        session.parse_header(translation_unit.cursor)
+        durations['parse_header'].append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        session.generate_conversion()
+        durations['generate_conversion'].append(time.perf_counter() - start_time)
+    result = {'interfaces': interfaces, 'methods': methods, 'depth': depth,
+              'converted_interfaces': len(session.interfaces), 'converted_structs': len(session.structs),
+              'converted_enums': len(session.enums)}
+    result.update({phase + '_seconds': statistics.median(durations[phase]) for phase in _phases})
+    return result
+
+
+def get_exponent(points: List[dict], parameter: str, phase: str) -> float:
+    """returns the slope of a phase between the first and last point of a curve in log-log space"""
+    first, last = points[0], points[-1]
+    first_seconds, last_seconds = first[phase + '_seconds'], last[phase + '_seconds']
+    if first[parameter] == last[parameter] or first_seconds <= 0 or last_seconds <= 0:
+        return 0.0
+    return math.log(last_seconds / first_seconds) / math.log(last[parameter] / first[parameter])
+
+
+def measure_scaling(interfaces: int, methods: int, depth: int, factors: List[int], clang_args: List[str] = None,
+                    repetitions: int = 5) -> dict:
+    """returns the base measurement and one curve per size parameter, scaled by each of the factors"""
+    base = {'interfaces': interfaces, 'methods': methods, 'depth': depth}
+    curves = {}
+    for parameter in base:
+        parameters = dict(base)
+        points = []
+        for factor in factors:
+            parameters[parameter] = base[parameter] * factor
+            # the depth can't exceed the number of interfaces
+            if parameters['depth'] > parameters['interfaces']:
+                continue
+            points.append(measure(clang_args=clang_args, repetitions=repetitions, **parameters))
+        curves[parameter] = {
+            'points': points,
+            'exponents': {phase: get_exponent(points, parameter, phase) for phase in _phases}
+        }
+    return {'base': measure(clang_args=clang_args, repetitions=repetitions, **base), 'curves': curves}
+
+
+def main():
+    parser = ArgumentParser(description='usage: [options] [clang-args*]')
+    parser.add_argument('--interfaces', type=int, default=32, help='base number of interfaces')
+    parser.add_argument('--methods', type=int, default=8, help='base number of methods per interface')
+    parser.add_argument('--depth', type=int, default=4, help='base inheritance depth')
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='factors every size parameter is scaled by')
+    parser.add_argument('--repetitions', type=int, default=5, help='repetitions of every measurement')
+    parser.add_argument('--output', help='file the JSON results are written to instead of stdout')
+    parser.add_argument('clang_args', nargs=REMAINDER)
+    args = parser.parse_args()
+    results = measure_scaling(args.interfaces, args.methods, args.depth, args.factors, args.clang_args,
+                              args.repetitions)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
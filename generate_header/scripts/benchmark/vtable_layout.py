@@ -0,0 +1,55 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Compares header bytes and compile time of the flat vtable layout against the nested one, which embeds the vtable
+of a single direct base class. The nested header includes the static asserts of its layout, so compiling it also
+checks that both layouts are identical. Run it on the header compilation of the full pluginterfaces tree to get
+representative numbers. The compiler is taken from the CC environment variable.
+
+usage (from the scripts directory): python -m benchmark.vtable_layout [header] [repetitions] [clang-args*]
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmark.compile_time import measure_compile
+from interface_convert import create_translation_unit, ConversionSession, output_variants
+
+
+def measure(header_path: Path, clang_args=None, repetitions: int = 10) -> dict:
+    translation_unit = create_translation_unit(header_path, str(header_path.parents[2]), clang_args)
+    session = ConversionSession()
+    session.parse_header(translation_unit.cursor)
+    compiler = os.environ.get('CC', 'cc')
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ['full', 'nested']:
+            output_path = session.write_variants([output_variants[name]], Path(directory))[0]
+            source_path = Path(directory) / '{}.c'.format(name)
+            source_path.write_text('#include "{}"\n'.format(output_path.name))
+            compile_result = measure_compile(compiler, source_path, Path(directory), repetitions)
+            results['{}_bytes'.format(name)] = output_path.stat().st_size
+            results['{}_seconds'.format(name)] = compile_result['seconds']
+            results['{}_compiles'.format(name)] = compile_result['succeeded']
+    results['bytes_ratio'] = results['nested_bytes'] / results['full_bytes']
+    return results
+
+
+def main():
+    header_path = Path(sys.argv[1] if len(sys.argv) > 1 else Path(__file__).parents[1] / 'test' / 'headers' /
+                       'compilation.h').absolute()
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    for name, value in measure(header_path, sys.argv[3:], repetitions).items():
+        print('{}: {}'.format(name, round(value, 6) if isinstance(value, float) else value))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,11 +6,16 @@
 # or distributed except according to the terms contained in the LICENSE file.
 # -----------------------------------------------------------------------------
 
+import bisect
+import hashlib
+import json
+import os
+import threading
 from pathlib import Path
-from typing import List
+from typing import List, Tuple, Optional
 
 import clang
-from clang.cindex import CursorKind, TypeKind, Cursor, Type
+from clang.cindex import CursorKind, TypeKind, Cursor, Type, Index, TranslationUnit, Diagnostic, conf
 # noinspection PyProtectedMember
 from clang.cindex import TokenGroup as TGroup
 
@@ -22,12 +27,244 @@ def set_library_path():
     clang.cindex.Config.set_library_path(str(libclang_path))
 
 
-def create_translation_unit(header_path: Path, include_path: str, clang_args: [List[str]] = None) -> Type:
+"""named sets of libclang parse options, the incomplete profile is used to build precompiled headers"""
+parse_profiles = {
+    'default': TranslationUnit.PARSE_NONE,
+    'fast': TranslationUnit.PARSE_SKIP_FUNCTION_BODIES,
+    'incomplete': TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | TranslationUnit.PARSE_INCOMPLETE
+}
+
+_shared_indices = threading.local()
+
+
+def get_shared_index() -> Index:
+    """returns an index which is reused by all translation units created in the current thread and process"""
     set_library_path()
+    index = getattr(_shared_indices, 'index', None)
+    if index is None or _shared_indices.pid != os.getpid():
+        index = Index.create()
+        _shared_indices.index = index
+        _shared_indices.pid = os.getpid()
+    return index
+
+
+def _create_args(include_path: str, clang_args: List[str], precompiled_header: Path) -> List[str]:
     args = ['-I', include_path, '-x', 'c++-header']
     if clang_args:
         args.extend(clang_args)
-    return clang.cindex.Index.create().parse(header_path, args)
+    if precompiled_header:
+        args.extend(['-include-pch', str(precompiled_header)])
+    return args
+
+
+def create_translation_unit(header_path: Path, include_path: str, clang_args: [List[str]] = None,
+                            unsaved_files: List[Tuple[str, str]] = None, profile: str = 'default',
+                            precompiled_header: Path = None, index: Index = None) -> TranslationUnit:
+    set_library_path()
+    if index is None:
+        index = get_shared_index()
+    args = _create_args(include_path, clang_args, precompiled_header)
+    translation_unit = index.parse(header_path, args, unsaved_files, parse_profiles[profile])
+    _set_unsaved_files(translation_unit, unsaved_files)
+    return translation_unit
+
+
+def reparse_translation_unit(translation_unit: TranslationUnit, unsaved_files: List[Tuple[str, str]] = None,
+                             profile: str = 'default'):
+    """reparses a translation unit with the given unsaved files and drops the caches referring to its old AST"""
+    translation_unit.reparse(unsaved_files, parse_profiles[profile])
+    _set_unsaved_files(translation_unit, unsaved_files)
+    invalidate_caches(translation_unit)
+
+
+def _set_unsaved_files(translation_unit: TranslationUnit, unsaved_files: Optional[List[Tuple[str, str]]]):
+    """stores the unsaved files on the translation unit, the token cache needs the size of the parsed buffers"""
+    translation_unit._unsaved_files = {str(name): content for name, content in unsaved_files or []}
+
+
+def get_parsed_file_size(translation_unit: TranslationUnit, file_name: str) -> Optional[int]:
+    """
+    returns the size in bytes of a file as libclang parsed it, which is the unsaved buffer replacing it if any,
+    or None if the size is unknown
+    """
+    unsaved_files = getattr(translation_unit, '_unsaved_files', None) or {}
+    if file_name in unsaved_files:
+        content = unsaved_files[file_name]
+        return len(content.encode()) if isinstance(content, str) else len(content)
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return None
+
+
+def _get_library_identity() -> list:
+    """returns path, size and modification time of the loaded libclang, which change with its version"""
+    set_library_path()
+    library_path = conf.lib._name
+    try:
+        stat = os.stat(library_path)
+    except (OSError, TypeError):
+        return [library_path]
+    return [library_path, stat.st_size, stat.st_mtime_ns]
+
+
+def get_precompiled_header_path(directory: Path, includes: List[str], include_path: str,
+                                clang_args: [List[str]] = None) -> Path:
+    """
+    returns the path of a precompiled header in directory, named after a hash of everything it depends on,
+    so builds with different includes, arguments or libclang versions never share a precompiled header
+    """
+    key = json.dumps([includes, include_path, clang_args or [], _get_library_identity()])
+    return Path(directory) / 'vst3_c_api_base-{}.pch'.format(hashlib.sha256(key.encode()).hexdigest()[:16])
+
+
+def create_precompiled_header(pch_path: Path, includes: List[str], include_path: str,
+                              clang_args: [List[str]] = None, index: Index = None) -> Path:
+    """
+    precompiles the given includes into pch_path, translation units created with this precompiled header
+    see its declarations before the ones of their own header, so it should only contain stable base headers
+    which are included first anyway, the file is written next to pch_path and renamed over it, so concurrent
+    builds never read a partially written precompiled header
+    """
+    set_library_path()
+    if index is None:
+        index = get_shared_index()
+    source_path = str(pch_path.with_suffix('.h'))
+    source = ''.join('#include "{}"\n'.format(include) for include in includes)
+    translation_unit = index.parse(source_path, _create_args(include_path, clang_args, None), [(source_path, source)],
+                                   parse_profiles['incomplete'])
+    for diagnostic in translation_unit.diagnostics:
+        if diagnostic.severity >= Diagnostic.Fatal:
+            raise RuntimeError('Precompiling headers failed: {}'.format(diagnostic))
+    temporary_path = pch_path.with_name('.{}.{}.tmp'.format(pch_path.name, os.getpid()))
+    try:
+        translation_unit.save(str(temporary_path))
+        os.replace(temporary_path, pch_path)
+    finally:
+        if temporary_path.exists():
+            temporary_path.unlink()
+    return pch_path
+
+
+class _FileTokens:
+    """raw tokens of one source file with their offsets, spellings are read from libclang on first access only"""
+
+    def __init__(self, tokens: list, size: int):
+        self._tokens = tokens
+        self._spellings = [None] * len(tokens)
+        # the second integer of a token is the raw encoding of its location, which is the offset of the file
+        # within the source manager plus the offset within the file, so one location call yields all offsets
+        self.base = tokens[0].int_data[1] - tokens[0].location.offset if tokens else 0
+        self.size = size
+        self.offsets = [token.int_data[1] - self.base for token in tokens]
+
+    def contains(self, raw_location: int) -> bool:
+        return self.base <= raw_location <= self.base + self.size
+
+    def find(self, offset: int) -> int:
+        """returns the index of the first token starting at or after offset"""
+        return bisect.bisect_left(self.offsets, offset)
+
+    def spelling(self, index: int) -> str:
+        if self._spellings[index] is None:
+            self._spellings[index] = self._tokens[index].spelling
+        return self._spellings[index]
+
+
+class TokenCache:
+    """
+    tokenizes every source file of a translation unit at most once into an offset-indexed token array,
+    extents are then resolved by bisection over the token offsets instead of tokenizing them again
+    """
+
+    def __init__(self, translation_unit: TranslationUnit):
+        self._translation_unit = translation_unit
+        self._files = {}
+        self._cursor_tokens = {}
+
+    def _get_file_tokens(self, file_name: str) -> Optional[_FileTokens]:
+        if file_name not in self._files:
+            size = get_parsed_file_size(self._translation_unit, file_name)
+            if size is None:
+                # files of unknown size are tokenized per extent
+                self._files[file_name] = None
+                return None
+            extent = self._translation_unit.get_extent(file_name, [0, size])
+            self._files[file_name] = _FileTokens(list(TGroup.get_tokens(self._translation_unit, extent)), size)
+        return self._files[file_name]
+
+    def _find_file_tokens(self, token) -> Optional[_FileTokens]:
+        raw_location = token.int_data[1]
+        for file_tokens in self._files.values():
+            if file_tokens is not None and file_tokens.contains(raw_location):
+                return file_tokens
+        return self._get_file_tokens(token.location.file.name)
+
+    @staticmethod
+    def _find_first_index(file_tokens: _FileTokens, first_token, token_count: int) -> Optional[int]:
+        """
+        returns the index of first_token within the file tokens, or None if they do not hold it, which is the case
+        for another inclusion of the same file, or if its tokens do not all fit into the file tokens
+        """
+        raw_location = first_token.int_data[1]
+        if not file_tokens.contains(raw_location):
+            return None
+        offset = raw_location - file_tokens.base
+        first_index = file_tokens.find(offset)
+        if first_index + token_count > len(file_tokens.offsets) or file_tokens.offsets[first_index] != offset:
+            return None
+        return first_index
+
+    def get_extent_spellings(self, file_name: str, start_offset: int, end_offset: int) -> List[str]:
+        """returns the spellings of all tokens of a file starting within the given offsets"""
+        file_tokens = self._get_file_tokens(file_name)
+        if file_tokens is None:
+            extent = self._translation_unit.get_extent(file_name, [start_offset, end_offset])
+            return [token.spelling for token in TGroup.get_tokens(self._translation_unit, extent)]
+        return [file_tokens.spelling(index) for index in range(file_tokens.find(start_offset),
+                                                               file_tokens.find(end_offset))]
+
+    def get_cursor_tokens(self, cursor: Cursor) -> List[Tuple[int, str]]:
+        """
+        returns offset and spelling of the tokens Cursor.get_tokens() yields, the cursor is tokenized once to find
+        where its tokens are spelled, which may be a macro definition, the spellings are shared with the file tokens
+        """
+        key = get_cursor_key(cursor)
+        if key not in self._cursor_tokens:
+            tokens = list(cursor.get_tokens())
+            file_tokens = self._find_file_tokens(tokens[0]) if tokens else None
+            first_index = self._find_first_index(file_tokens, tokens[0], len(tokens)) if file_tokens else None
+            if first_index is None:
+                result = [(token.location.offset, token.spelling) for token in tokens]
+            else:
+                result = [(file_tokens.offsets[index], file_tokens.spelling(index))
+                          for index in range(first_index, first_index + len(tokens))]
+            self._cursor_tokens[key] = result
+        return self._cursor_tokens[key]
+
+
+def get_cursor_key(cursor: Cursor) -> tuple:
+    """returns a hashable key identifying a cursor by its structure, which needs no call into libclang"""
+    return cursor._kind_id, cursor.xdata, tuple(cursor.data)
+
+
+def get_token_cache(translation_unit: TranslationUnit) -> TokenCache:
+    """returns the token cache of a translation unit, it is stored on the translation unit to share its lifetime"""
+    token_cache = getattr(translation_unit, '_token_cache', None)
+    if token_cache is None:
+        token_cache = TokenCache(translation_unit)
+        translation_unit._token_cache = token_cache
+    return token_cache
+
+
+"""attributes holding the caches stored on a translation unit, their entries refer to cursors of the parsed AST"""
+_translation_unit_caches = ['_token_cache', '_constant_evaluator', '_type_converter', '_scope_cache']
+
+
+def invalidate_caches(translation_unit: TranslationUnit):
+    """drops all caches stored on a translation unit, required after reparsing it"""
+    for name in _translation_unit_caches:
+        setattr(translation_unit, name, None)
 
 
 def is_kind(cursor_or_type: [Cursor, Type], kind: str) -> bool:
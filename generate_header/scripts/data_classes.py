@@ -6,27 +6,93 @@
 # or distributed except according to the terms contained in the LICENSE file.
 #-----------------------------------------------------------------------------
 
-from typing import List
+import sys
+import weakref
+from typing import List, Tuple
 from typing import Union as UnionType
 
 
 class Container(list):
+    """
+    insertion-ordered list of named elements with a name index for constant-time lookups,
+    elements sharing a name are all kept in the list while lookups resolve to the first one stored
+    """
+
+    def __init__(self, iterable=()):
+        super().__init__()
+        self._index = {}
+        self.extend(iterable)
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
     def __contains__(self, name: str) -> bool:
-        for element in self:
-            if element.name == name:
-                return True
-        return False
+        return name in self._index
 
     def __getitem__(self, name_or_index: UnionType[str, int, slice]):
         if type(name_or_index) != str:
             return super().__getitem__(name_or_index)
+        return self._index.get(name_or_index, None)
+
+    def __setitem__(self, index: UnionType[int, slice], value):
+        super().__setitem__(index, value)
+        self._rebuild_index()
+
+    def __delitem__(self, index: UnionType[int, slice]):
+        super().__delitem__(index)
+        self._rebuild_index()
+
+    def __iadd__(self, elements):
+        self.extend(elements)
+        return self
+
+    def __imul__(self, count: int):
+        super().__imul__(count)
+        self._rebuild_index()
+        return self
+
+    def append(self, element):
+        super().append(element)
+        self._index.setdefault(element.name, element)
+
+    def extend(self, elements):
+        for element in elements:
+            self.append(element)
+
+    def insert(self, index: int, element):
+        super().insert(index, element)
+        self._rebuild_index()
+
+    def pop(self, index: int = -1):
+        element = super().pop(index)
+        self._rebuild_index()
+        return element
+
+    def remove(self, element):
+        super().remove(element)
+        self._rebuild_index()
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._rebuild_index()
+
+    def reverse(self):
+        super().reverse()
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        self._index = {}
         for element in self:
-            if element.name == name_or_index:
-                return element
-        return None
+            self._index.setdefault(element.name, element)
 
 
 class Base:
+    __slots__ = ('_name', '_source_location')
+
     def __init__(self, name: str = None, source_location: str = None):
         self._name = name
         self._source_location = source_location
@@ -39,8 +105,13 @@ class Base:
     def source_location(self) -> str:
         return self._source_location
 
+    def to_dict(self) -> dict:
+        return {'name': self._name, 'source_location': self._source_location}
+
 
 class Enum(Base):
+    __slots__ = ('_enumerators',)
+
     def __init__(self, name: str, source_location: str):
         super().__init__(name, source_location)
         self._enumerators = []
@@ -55,12 +126,123 @@ class Enum(Base):
             enumerator += f' = {expression}'
         self._enumerators.append(enumerator)
 
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        result['enumerators'] = list(self._enumerators)
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Enum':
+        enum = cls(data['name'], data['source_location'])
+        enum._enumerators.extend(data['enumerators'])
+        return enum
+
+
+class _ParameterList:
+    """shared parameters of methods of the same signature, wrapped as tuples can't be referenced weakly"""
+    __slots__ = ('parameters', '__weakref__')
+
+    def __init__(self, parameters: Tuple['Parameter', ...]):
+        self.parameters = parameters
+
+
+"""interned parameter lists, an entry is dropped along with the last method referring to it"""
+_parameter_lists = weakref.WeakValueDictionary()
+
+
+class Parameter:
+    """
+    immutable method parameter, equal parameters share a single instance across all sessions as long as any of
+    them refers to it
+    """
+    __slots__ = ('_type', '_name', '__weakref__')
+    _instances = weakref.WeakValueDictionary()
+
+    def __new__(cls, parameter_type: str, name: str):
+        instance = cls._instances.get((parameter_type, name))
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._type = sys.intern(parameter_type)
+            instance._name = sys.intern(name)
+            cls._instances[(instance._type, instance._name)] = instance
+        return instance
+
+    def __reduce__(self):
+        return self.__class__, (self._type, self._name)
+
+    @property
+    def type(self) -> str:
+        return self._type
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def to_dict(self) -> dict:
+        return {'type': self._type, 'name': self._name}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Parameter':
+        return cls(data['type'], data['name'])
+
+
+class Method:
+    """method of an interface, its C declaration is only rendered by the generator"""
+    __slots__ = ('_name', '_return_type', '_parameter_list', '_is_const')
+
+    def __init__(self, name: str, return_type: str, parameters: List[Parameter], is_const: bool = False):
+        self._name = sys.intern(name)
+        self._return_type = sys.intern(return_type)
+        self._is_const = is_const
+        parameters = tuple(parameters)
+        # methods of the same signature share their parameter list
+        self._parameter_list = _parameter_lists.get(parameters)
+        if self._parameter_list is None:
+            self._parameter_list = _ParameterList(parameters)
+            _parameter_lists[parameters] = self._parameter_list
+
+    def __reduce__(self):
+        # unpickled methods share their parameter list again
+        return self.__class__, (self._name, self._return_type, self.parameters, self._is_const)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def return_type(self) -> str:
+        return self._return_type
+
+    @property
+    def parameters(self) -> Tuple[Parameter, ...]:
+        return self._parameter_list.parameters
+
+    @property
+    def is_const(self) -> bool:
+        return self._is_const
+
+    def to_dict(self) -> dict:
+        return {'name': self._name, 'return_type': self._return_type,
+                'parameters': [parameter.to_dict() for parameter in self.parameters], 'const': self._is_const}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Method':
+        return cls(data['name'], data['return_type'], [Parameter.from_dict(parameter)
+                                                        for parameter in data['parameters']], data['const'])
+
 
 class Interface(Base):
+    __slots__ = ('_description', '_base_classes', '_derived_classes', '_linearization', '_diamond_bases',
+                 '_duplicate_bases', '_methods', '_iid')
+
     def __init__(self, name: str, source_location: str, description: str):
         super().__init__(name, source_location)
         self._description = description
         self._base_classes = []
+        self._derived_classes = ()
+        self._linearization = None
+        self._diamond_bases = ()
+        self._duplicate_bases = ()
         self._methods = []
         self._iid = None
 
@@ -69,41 +251,102 @@ class Interface(Base):
         return self._description
 
     @property
-    def methods(self) -> List[str]:
+    def methods(self) -> List[Method]:
         return self._methods
 
     @property
-    def base_classes(self) -> List['Interface']:
-        result = []
+    def direct_base_classes(self) -> Tuple['Interface', ...]:
+        """base classes in the order they were added, including duplicates"""
+        return tuple(self._base_classes)
+
+    @property
+    def base_classes(self) -> Tuple['Interface', ...]:
+        """all direct and indirect base classes, each base class follows its own base classes"""
+        if self._linearization is None:
+            self.finalize()
+        return self._linearization
+
+    @property
+    def diamond_bases(self) -> Tuple['Interface', ...]:
+        """base classes inherited through more than one direct base class"""
+        if self._linearization is None:
+            self.finalize()
+        return self._diamond_bases
+
+    @property
+    def duplicate_bases(self) -> Tuple['Interface', ...]:
+        """direct base classes which were added more than once"""
+        if self._linearization is None:
+            self.finalize()
+        return self._duplicate_bases
+
+    def finalize(self):
+        """linearizes the base classes, the result is kept until a base class is added to this or a base interface"""
+        linearization = []
+        inherited_bases = set()
+        direct_bases = set()
+        diamond_bases = []
+        duplicate_bases = []
         for base_class in self._base_classes:
-            for base_base_class in base_class.base_classes:
-                if base_base_class not in result:
-                    result.append(base_base_class)
-            if base_class not in result:
-                result.append(base_class)
-        return result
+            if id(base_class) in direct_bases:
+                duplicate_bases.append(base_class)
+                continue
+            direct_bases.add(id(base_class))
+            for inherited_base in base_class.base_classes + (base_class,):
+                if id(inherited_base) not in inherited_bases:
+                    inherited_bases.add(id(inherited_base))
+                    linearization.append(inherited_base)
+                elif inherited_base not in diamond_bases:
+                    diamond_bases.append(inherited_base)
+        self._linearization = tuple(linearization)
+        self._diamond_bases = tuple(diamond_bases)
+        self._duplicate_bases = tuple(duplicate_bases)
+
+    def _invalidate(self):
+        if self._linearization is not None:
+            self._linearization = None
+            for derived_class in self._derived_classes:
+                derived_class._invalidate()
 
     @property
     def iid(self) -> str:
         return self._iid
 
-    # noinspection SpellCheckingInspection
-    def add_method(self, name: str, return_type: str, args: List[str]):
-        method = f'{return_type} (SMTG_STDMETHODCALLTYPE* {name}) (void* thisInterface'
-        if args:
-            method += ', ' + ', '.join(args)
-        method += ');'
-        self._methods.append(method)
+    def add_method(self, name: str, return_type: str, parameters: List[Parameter], is_const: bool = False):
+        self._methods.append(Method(name, return_type, parameters, is_const))
 
     def add_base_class(self, base_interface: 'Interface'):
         self._base_classes.append(base_interface)
+        base_interface._derived_classes += (self,)
+        self._invalidate()
 
     def set_iid(self, token1, token2, token3, token4):
         self._iid = 'static const Steinberg_TUID {}_iid = SMTG_INLINE_UID ({}, {}, {}, {});'.format(self.name, token1, token2,
                                                                                                     token3, token4)
 
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        result['description'] = self._description
+        result['base_classes'] = [base_class.name for base_class in self._base_classes]
+        result['methods'] = [method.to_dict() for method in self._methods]
+        result['iid'] = self._iid
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict, interfaces: Container) -> 'Interface':
+        """base classes are resolved by name against the already loaded interfaces"""
+        interface = cls(data['name'], data['source_location'], data['description'])
+        for base_class_name in data['base_classes']:
+            if base_class_name in interfaces:
+                interface.add_base_class(interfaces[base_class_name])
+        interface._methods.extend(Method.from_dict(method) for method in data['methods'])
+        interface._iid = data['iid']
+        return interface
+
 
 class Struct(Base):
+    __slots__ = ('_members',)
+
     def __init__(self, name: str, source_location: str):
         super().__init__(name, source_location)
         self._members = []
@@ -115,18 +358,40 @@ class Struct(Base):
     def add_member(self, member):
         self._members.append(member)
 
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        result['members'] = list(self._members)
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Struct':
+        struct = cls(data['name'], data['source_location'])
+        struct._members.extend(data['members'])
+        return struct
+
 
 class Variable(Base):
+    __slots__ = ('_value_type', '_value')
+
     def __init__(self, name: str, value_type: str, value: str):
         super().__init__(name)
-        self._value_type = value_type
+        self._value_type = sys.intern(value_type)
         self._value = value
 
     def __str__(self):
         return f'static {self._value_type} {self.name} = {self._value};'
 
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'value_type': self._value_type, 'value': self._value}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Variable':
+        return cls(data['name'], data['value_type'], data['value'])
+
 
 class Union(Base):
+    __slots__ = ('_members',)
+
     def __init__(self, parent: str):
         super().__init__(parent)
         self._members = []
@@ -138,11 +403,29 @@ class Union(Base):
     def add_member(self, member):
         self._members.append(member)
 
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'members': list(self._members)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Union':
+        union = cls(data['name'])
+        union._members.extend(data['members'])
+        return union
+
 
 class Typedef(Base):
+    __slots__ = ('_return_type',)
+
     def __init__(self, name: str, return_type: str):
         super().__init__(name)
-        self._return_type = return_type
+        self._return_type = sys.intern(return_type)
 
     def __str__(self):
         return f'typedef {self._return_type} {self.name};'
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'return_type': self._return_type}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Typedef':
+        return cls(data['name'], data['return_type'])
@@ -6,30 +6,55 @@
 # or distributed except according to the terms contained in the LICENSE file.
 #-----------------------------------------------------------------------------
 
+import os
 import sys
-from datetime import date
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
+from output_cache import write_if_changed
+
+
+def get_creation_date(creation_date: date = None) -> date:
+    """returns the given date, the date of SOURCE_DATE_EPOCH for reproducible builds or today, in this order"""
+    if creation_date:
+        return creation_date
+    if os.environ.get('SOURCE_DATE_EPOCH'):
+        return datetime.fromtimestamp(int(os.environ['SOURCE_DATE_EPOCH']), timezone.utc).date()
+    return date.today()
+
+
+def get_header_compilation_path(pluginterfaces_path: Path) -> Path:
+    """returns the path of the header compilation within a pluginterfaces checkout"""
+    return pluginterfaces_path / 'vst' / 'header_compilation.h'
+
 
 # noinspection SpellCheckingInspection
-def _generate_header(pluginterfaces_path, result_path):
+def render_header_compilation(pluginterfaces_path: Path, creation_date: date = None) -> str:
+    """returns the content of the header compilation of a pluginterfaces checkout without writing it"""
+    result_path = get_header_compilation_path(pluginterfaces_path)
     blocklist = ['ivsttestplugprovider.h']
     pluginterfaces_includes = []
     for file in ['gui/iplugviewcontentscalesupport.h', 'gui/iplugview.h', 'base/ibstream.h']:
         pluginterfaces_includes.append(file)
-    for file in (pluginterfaces_path / 'vst').iterdir():
-        if file.name in blocklist:
+    # sorted, as the order of iterdir depends on the file system
+    for file in sorted((pluginterfaces_path / 'vst').iterdir()):
+        # a header compilation left over from a previous run must not include itself
+        if file.name in blocklist or file.name == result_path.name:
             continue
         pluginterfaces_includes.append('vst/{}'.format(file.name))
     env = Environment(loader=FileSystemLoader(Path(__file__).parent / 'templates'), trim_blocks=True)
     template = env.get_template(result_path.name)
     file_name = result_path.relative_to(result_path.parents[2])
-    today = date.today().strftime("%m/%Y")
-    content = template.render(file_name=file_name, date=today, pluginterfaces_includes=pluginterfaces_includes)
-    with result_path.open('w') as result_file:
-        result_file.write(content)
+    month = get_creation_date(creation_date).strftime("%m/%Y")
+    return template.render(file_name=file_name, date=month, pluginterfaces_includes=pluginterfaces_includes)
+
+
+def _generate_header(pluginterfaces_path, result_path, creation_date: date = None):
+    content = render_header_compilation(pluginterfaces_path, creation_date)
+    # an unchanged header compilation keeps its modification time, it is no build output, so it gets no sidecar
+    write_if_changed(result_path, lambda writer: writer.write(content), sidecar=False)
     return content
 
 
@@ -39,8 +64,10 @@ def main():
         print('Pluginterfaces source directory was not specified!')
         exit(1)
     pluginterfaces_path = Path(sys.argv[1])
-    result_path = pluginterfaces_path / 'vst' / 'header_compilation.h'
-    print(_generate_header(pluginterfaces_path, result_path))
+    # an optional second argument overrides the creation date, e.g. 2024-01-31
+    creation_date = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+    result_path = get_header_compilation_path(pluginterfaces_path)
+    print(_generate_header(pluginterfaces_path, result_path, creation_date))
 
 
 if __name__ == '__main__':
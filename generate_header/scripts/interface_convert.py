@@ -32,7 +32,8 @@ The data storage is based on component-specific classes which serve to house and
 information, with one instance being created for each individual component that is parsed. They are
 then arranged in a storage structure which facilitates sequential access to the individual instances of
 each class, the return of class-specific data based on its name or a given extent and provides access
-to all stored names, approximating the functionality of a list.
+to all stored names, approximating the functionality of a list. All storage structures of one conversion
+are owned by a conversion session, so that several conversions can run side by side in one process.
 
 To function properly, the script must be supplied with the original C++ header file, as well as a
 working directory that houses all other files this header includes, as these will not be
@@ -49,12 +50,22 @@ recognised otherwise.
 
 import re
 import sys
+from collections import Counter
+from contextlib import nullcontext, redirect_stdout
+from io import StringIO
+import tempfile
 from argparse import ArgumentParser, REMAINDER
 from pathlib import Path
-from typing import List
-from clang.cindex import SourceLocation, Cursor, Type
-from clang_helpers import create_translation_unit, TokenGroup, is_not_kind, is_valid, is_kind
-from data_classes import Enum, Container, Interface, Struct, Variable, Union, Typedef
+from typing import List, Dict, Tuple, TextIO
+from clang.cindex import SourceLocation, Cursor, CursorKind, Type, TranslationUnit
+from clang_helpers import create_translation_unit, create_precompiled_header, get_precompiled_header_path, \
+    parse_profiles, get_token_cache, get_cursor_key, is_not_kind, is_valid, is_kind
+from generate_header_compilation import get_header_compilation_path, render_header_compilation
+from data_classes import Enum, Container, Interface, Struct, Variable, Union, Typedef, Method, Parameter
+from intermediate_representation import storage_names, dump_ir, load_ir
+from output_cache import OutputCache, write_if_changed
+from parse_cache import hash_dependencies
+from profile_convert import ConversionProfiler
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -62,46 +73,6 @@ from data_classes import Enum, Container, Interface, Struct, Variable, Union, Ty
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-def parse_header(cursor: Cursor):
-    """excludes unusable parts and executes parse functions"""
-    if is_not_kind(cursor, 'TRANSLATION_UNIT'):
-        return
-    root_path = normalise_link(str(Path(cursor.spelling).parents[2]))
-    already_parsed_includes = []
-    for cursor_child in cursor.get_children():
-        cursor_child_location = normalise_link(cursor_child.location.file.name)
-        if not cursor_child_location.startswith(root_path) or cursor_child_location in already_parsed_includes:
-            continue
-        already_parsed_includes.append(cursor_child_location)
-        if parse_namespace(cursor_child):
-            continue
-        parsing(cursor_child)
-
-
-def parse_namespace(cursor: Cursor, namespace: str = '') -> bool:
-    """recursively parses namespaces and executes parse functions"""
-    if is_not_kind(cursor, 'NAMESPACE'):
-        return False
-    if namespace:
-        namespace += '::'
-    namespace += cursor.spelling
-    for cursor_child in cursor.get_children():
-        if parse_namespace(cursor_child, namespace):
-            continue
-        parsing(cursor_child, namespace)
-    return True
-
-
-def parsing(cursor: Cursor, namespace: str = ''):
-    """executes specific parse functions"""
-    parse_interfaces(cursor)
-    parse_enum(cursor)
-    parse_structs(cursor)
-    parse_iid(cursor, namespace)
-    store_typedefs(cursor, typedefs)
-    parse_variables(cursor)
-
-
 # ----- parse typedefs -------------------------------------------------------------------------------------------------
 
 def store_typedefs(cursor, typedef_list: Container):
@@ -111,73 +82,40 @@ def store_typedefs(cursor, typedef_list: Container):
         typedef_list.append(Typedef(name, return_type))
 
 
+def _store_typedef_decl(cursor: Cursor, typedef_list: Container):
+    return_type, name = _convert_typedef_decl(cursor)
+    if return_type and name:
+        typedef_list.append(Typedef(name, return_type))
+
+
 # noinspection SpellCheckingInspection
 def parse_typedefs(cursor):
     """parses typedefs and formats output"""
-    if is_not_kind(cursor, 'TYPEDEF_DECL') and is_not_kind(cursor, 'TYPE_ALIAS_DECL'):
+    kind = cursor.kind
+    if kind != CursorKind.TYPEDEF_DECL and kind != CursorKind.TYPE_ALIAS_DECL:
         return None, None
-    if is_kind(cursor.underlying_typedef_type, 'CONSTANTARRAY'):
-        return_type = cursor.underlying_typedef_type.element_type
-        name_string = '{}[{}]'.format(convert_type(cursor.type), cursor.underlying_typedef_type.element_count)
-    else:
-        return_type = cursor.underlying_typedef_type
-        name_string = convert_cursor(cursor)
-    return create_struct_prefix(return_type) + convert_type(return_type), name_string
+    return _convert_typedef_decl(cursor)
 
 
-# ----- parse interfaces -----------------------------------------------------------------------------------------------
-
 # noinspection SpellCheckingInspection
-def parse_interfaces(cursor):
-    """executes all specific interface-related parse functions and stores information"""
-    if is_not_kind(cursor, 'CLASS_DECL') or cursor.spelling in blocklist:
-        return
-    children = list(cursor.get_children())
-    if not children:
-        return
-    interface = Interface(convert_cursor(cursor), get_cursor_location(cursor.location), cursor.brief_comment)
-    for cursor_child in children:
-        store_typedefs(cursor_child, interface_typedefs)
-        parse_enum(cursor_child)
-        parse_inheritance(cursor_child, interface)
-        parse_variables(cursor_child)
-        parse_methods(cursor_child, interface)
-    interfaces.append(interface)
-
-
-def parse_inheritance(cursor: Cursor, interface: Interface):
-    """parses and stores information about interface inheritance"""
-    if is_not_kind(cursor, 'CXX_BASE_SPECIFIER'):
-        return
-    base_interface_name = ''
-    if is_kind(cursor.type, 'ELABORATED'):
-        base_interface_name = create_namespace_prefix_for_type(cursor.type)
-    base_interface_name += convert_namespace(cursor.type.spelling)
-    if base_interface_name in interfaces:
-        interface.add_base_class(interfaces[base_interface_name])
+def _convert_typedef_decl(cursor: Cursor):
+    underlying_type = cursor.underlying_typedef_type
+    if is_kind(underlying_type, 'CONSTANTARRAY'):
+        return_type = underlying_type.element_type
+        name_string = '{}[{}]'.format(convert_type(cursor.type), underlying_type.element_count)
+    else:
+        return_type = underlying_type
+        name_string = convert_cursor(cursor)
+    return create_struct_prefix(return_type) + convert_type(return_type), name_string
 
 
 # ----- parse IIDs -----------------------------------------------------------------------------------------------------
 
-# noinspection SpellCheckingInspection
-def parse_iid(cursor: Cursor, namespace: str):
-    """parses and stores IIDs of interfaces"""
-    if is_not_kind(cursor, 'VAR_DECL') or not cursor.spelling.endswith('_iid'):
-        return
-    id_tokens = get_token_spellings_from_extent(cursor)
-    interface_name = convert_namespace(namespace)
-    if interface_name:
-        interface_name += '_'
-    interface_name += id_tokens[2]
-    if interface_name in interfaces:
-        interfaces[interface_name].set_iid(id_tokens[4], id_tokens[6], id_tokens[8], id_tokens[10])
-
-
 def get_token_spellings_from_extent(cursor: Cursor) -> List[str]:
     """uses tokens to return IID spellings as string"""
-    cursor_tu = cursor.translation_unit
-    extent = cursor_tu.get_extent(cursor.location.file.name, [cursor.extent.start.offset, cursor.extent.end.offset])
-    return [token.spelling for token in TokenGroup.get_tokens(cursor_tu, extent)]
+    extent = cursor.extent
+    return get_token_cache(cursor.translation_unit).get_extent_spellings(cursor.location.file.name,
+                                                                         extent.start.offset, extent.end.offset)
 
 
 # ----- parse methods --------------------------------------------------------------------------------------------------
@@ -186,19 +124,24 @@ def parse_methods(cursor: Cursor, interface: Interface):
     """executes method argument parse function and stores returned string"""
     if is_not_kind(cursor, 'CXX_METHOD'):
         return
+    _parse_method_decl(cursor, interface)
+
+
+def _parse_method_decl(cursor: Cursor, interface: Interface):
     method_name = cursor.spelling
-    method_return_type = create_struct_prefix(cursor.result_type) + convert_type(cursor.result_type)
+    result_type = cursor.result_type
+    method_return_type = create_struct_prefix(result_type) + convert_type(result_type)
     method_args = _parse_method_arguments(cursor)
-    interface.add_method(method_name, method_return_type, method_args)
+    interface.add_method(method_name, method_return_type, method_args, cursor.is_const_method())
 
 
-def _parse_method_arguments(cursor: Cursor) -> List[str]:
-    """parses method arguments and returns formatted string"""
+def _parse_method_arguments(cursor: Cursor) -> List[Parameter]:
+    """parses method arguments and returns them as parameters"""
     result = []
     for cursor_child in cursor.get_arguments():
         argument_type = convert_arg_type(cursor_child.type)
         name = _convert_method_args_name(cursor_child.spelling)
-        result.append(f'{argument_type} {name}')
+        result.append(Parameter(argument_type, name))
     return result
 
 
@@ -209,87 +152,20 @@ def _convert_method_args_name(source: str) -> str:
     return source
 
 
-# ----- specific parse functions ---------------------------------------------------------------------------------------
+# ----- parse fields ---------------------------------------------------------------------------------------------------
 
-# noinspection SpellCheckingInspection
-def parse_variables(cursor):
-    """parses and stores variable definition information"""
-    if is_not_kind(cursor, 'VAR_DECL') or (
-            is_not_kind(cursor.type, 'ELABORATED') and is_not_kind(cursor.type, 'TYPEDEF')):
-        return
-    if is_kind(cursor.type, 'ELABORATED') and (cursor.displayname == 'iid' or
-                                               cursor.displayname.endswith('_iid') or is_kind(
-                cursor.type.get_canonical(), 'RECORD')):
-        return
-    variable_value = _visit_children(list(cursor.get_children())[-1])
-    variables.append(Variable(convert_cursor(cursor), convert_type(cursor.type), variable_value))
-
-
-# noinspection SpellCheckingInspection
-def parse_structs(cursor):
-    """parses, formats and stores struct information, executes union parse function"""
-    if is_not_kind(cursor, 'STRUCT_DECL') or cursor.spelling in blocklist:
-        return
-    children = list(cursor.get_children())
-    if not children:
-        # this is only a forward declaration
-        return
-    fields = []
-    for cursor_child in children:
-        parse_union(convert_cursor(cursor), cursor_child)
-        if parse_enum(cursor_child) or is_not_kind(cursor_child, 'FIELD_DECL'):
-            continue
-        cursor_child_type = cursor_child.type
-        struct_args = ''
-        if is_kind(cursor_child.type, 'CONSTANTARRAY'):
-            cursor_child_type = cursor_child_type.element_type
-            struct_args = _visit_children(list(cursor_child.get_children())[-1])
-        struct_return = create_struct_prefix(cursor_child_type) + convert_type(cursor_child_type)
-        field = f'{struct_return} {cursor_child.spelling};'
-        if struct_args:
-            field = field[:-1] + f'[{struct_args}];'
-        fields.append(field)
-    if fields:
-        struct = Struct(convert_cursor(cursor), get_cursor_location(cursor.location))
-        for field in fields:
-            struct.add_member(field)
-        structs.append(struct)
-
-
-# noinspection SpellCheckingInspection
-def parse_union(parent, cursor):
-    """parses and stores union information within a struct"""
-    if is_not_kind(cursor, 'UNION_DECL') or cursor.spelling in blocklist:
-        return
-    children = list(cursor.get_children())
-    if not children:
-        # this is only a forward declaration
-        return
-    union = Union(parent)
-    for cursor_child in children:
-        if is_not_kind(cursor_child, 'FIELD_DECL'):
-            continue
-        member_return_type = create_struct_prefix(cursor_child.type) + convert_type(cursor_child.type)
-        union.add_member('{} {}'.format(member_return_type, convert_cursor(cursor_child)))
-    unions.append(union)
-
-
-# noinspection SpellCheckingInspection
-def parse_enum(cursor: Cursor) -> bool:
-    """parses and stores enum information"""
-    if is_not_kind(cursor, 'ENUM_DECL'):
-        return False
-    if not cursor.spelling or cursor.spelling.startswith('(unnamed enum'):
-        return True
-    enum = Enum(convert_cursor(cursor), get_cursor_location(cursor.location))
-    for cursor_child in cursor.get_children():
-        if is_not_kind(cursor_child, 'ENUM_CONSTANT_DECL'):
-            continue
-        enumerator_name = create_namespace_prefix(cursor_child) + cursor_child.spelling
-        enumerator_expression = _visit_children(cursor_child, use_definitions=False)
-        enum.add_enumerator(enumerator_name, enumerator_expression)
-    enums.append(enum)
-    return True
+def _convert_field_decl(cursor: Cursor) -> str:
+    """formats a struct field, constant arrays keep their size expression"""
+    field_type = cursor.type
+    struct_args = ''
+    if is_kind(field_type, 'CONSTANTARRAY'):
+        field_type = field_type.element_type
+        struct_args = _visit_children(list(cursor.get_children())[-1])
+    struct_return = create_struct_prefix(field_type) + convert_type(field_type)
+    field = f'{struct_return} {cursor.spelling};'
+    if struct_args:
+        field = field[:-1] + f'[{struct_args}];'
+    return field
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -299,68 +175,155 @@ def parse_enum(cursor: Cursor) -> bool:
 
 def _get_binary_operator(cursor: Cursor, children: List[Cursor]) -> str:
     """returns token spelling after passing extent of first cursor child"""
-    child_tokens = list(children[0].get_tokens())
+    token_cache = get_token_cache(cursor.translation_unit)
+    child_tokens = token_cache.get_cursor_tokens(children[0])
     if not child_tokens:
         raise Exception('No tokens found')
-    child_extent_length = children[0].extent.end.offset - children[0].extent.start.offset
-    child_extent_end = child_tokens[0].extent.start.offset + child_extent_length
-    for token in cursor.get_tokens():
-        if token.extent.start.offset < child_extent_end:
+    child_extent = children[0].extent
+    child_extent_length = child_extent.end.offset - child_extent.start.offset
+    child_extent_end = child_tokens[0][0] + child_extent_length
+    for token_offset, token_spelling in token_cache.get_cursor_tokens(cursor):
+        if token_offset < child_extent_end:
             continue
-        return token.spelling
+        return token_spelling
     return ''
 
 
 # noinspection SpellCheckingInspection
 def _visit_children(cursor: Cursor, use_definitions: bool = True) -> str:
     """analyses cursor children, formats and returns string based on CursorKind"""
-    if not list(cursor.get_tokens()):
-        cursor_tokens = get_token_spellings_from_extent(cursor)
-        if len(cursor_tokens) == 1:
-            return cursor_tokens[0]
-    children = list(cursor.get_children())
-    if is_kind(cursor, 'BINARY_OPERATOR'):
-        operator = _get_binary_operator(cursor, children)
-        return '{} {} {}'.format(_visit_children(children[0], use_definitions), operator,
-                                 _visit_children(children[1], use_definitions))
-    elif is_kind(cursor, 'PAREN_EXPR'):
-        return '({})'.format(_visit_children(children[0], use_definitions))
-    elif is_kind(cursor, 'UNARY_OPERATOR'):
-        operator = list(cursor.get_tokens())[0].spelling
-        return '{}{}'.format(operator, _visit_children(children[0], use_definitions))
-    elif is_kind(cursor, 'DECL_REF_EXPR'):
-        if use_definitions:
-            return _visit_children(cursor.get_definition(), use_definitions)
+    return get_constant_evaluator(cursor.translation_unit).convert(cursor, use_definitions)
+
+
+class UnsupportedKindError(TypeError):
+    def __init__(self, kind: CursorKind):
+        super().__init__('CursorKind: {} ist not supported!'.format(kind.name))
+        self.kind = kind
+
+
+class CyclicDefinitionError(RecursionError):
+    def __init__(self, usr: str):
+        super().__init__('Definition {} refers to itself'.format(usr))
+        self.usr = usr
+
+
+# tasks of the constant evaluator, combine tasks replace a number of results by a function of them
+_visit_task, _store_task, _combine_task = range(3)
+
+
+class ConstantEvaluator:
+    """
+    converts constant expressions without recursion, referenced definitions are converted once and cached by USR,
+    thus constants built from other constants are not expanded again at every use
+    """
+
+    def __init__(self):
+        self._definitions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def convert(self, cursor: Cursor, use_definitions: bool = True) -> str:
+        """converts an expression, definitions of referenced declarations are inserted if use_definitions is set"""
+        results = []
+        pending_definitions = set()
+        tasks = [(_visit_task, cursor, use_definitions)]
+        while tasks:
+            task_kind, first_argument, second_argument = tasks.pop()
+            if task_kind == _visit_task:
+                self._visit(first_argument, second_argument, tasks, results, pending_definitions)
+            elif task_kind == _store_task:
+                self._store(first_argument, second_argument, results, pending_definitions)
+            else:
+                arguments = results[len(results) - second_argument:]
+                del results[len(results) - second_argument:]
+                results.append(first_argument(*arguments))
+        return results[0]
+
+    def _store(self, usr: str, definition: Cursor, results: List[str], pending_definitions: set):
+        # the definition is stored along with its conversion to keep its translation unit and thus the USR valid
+        self._definitions[usr] = (definition, results[-1])
+        pending_definitions.discard(usr)
+
+    # noinspection SpellCheckingInspection
+    def _visit(self, cursor: Cursor, use_definitions: bool, tasks: list, results: List[str],
+               pending_definitions: set):
+        """
+        appends the conversion of cursor to results or schedules the conversion of its children followed by a task
+        combining their results
+        """
+        cursor_tokens = get_token_cache(cursor.translation_unit).get_cursor_tokens(cursor)
+        if not cursor_tokens:
+            # the spellings of the extent take the shape of cursor tokens, their offsets are unknown
+            cursor_tokens = [(None, spelling) for spelling in get_token_spellings_from_extent(cursor)]
+            if len(cursor_tokens) == 1:
+                results.append(cursor_tokens[0][1])
+                return
+        children = list(cursor.get_children())
+        kind = cursor.kind
+        if kind == CursorKind.BINARY_OPERATOR:
+            operator = _get_binary_operator(cursor, children)
+            tasks.append((_combine_task, lambda left, right: '{} {} {}'.format(left, operator, right), 2))
+            tasks.append((_visit_task, children[1], use_definitions))
+            tasks.append((_visit_task, children[0], use_definitions))
+        elif kind == CursorKind.PAREN_EXPR:
+            tasks.append((_combine_task, lambda operand: '({})'.format(operand), 1))
+            tasks.append((_visit_task, children[0], use_definitions))
+        elif kind == CursorKind.UNARY_OPERATOR:
+            operator = cursor_tokens[0][1]
+            tasks.append((_combine_task, lambda operand: '{}{}'.format(operator, operand), 1))
+            tasks.append((_visit_task, children[0], use_definitions))
+        elif kind == CursorKind.DECL_REF_EXPR:
+            definition = cursor.get_definition() if use_definitions else None
+            if definition is None:
+                results.append(convert_cursor(cursor))
+                return
+            usr = definition.get_usr()
+            if usr in self._definitions:
+                self.hits += 1
+                results.append(self._definitions[usr][1])
+                return
+            if usr in pending_definitions:
+                raise CyclicDefinitionError(usr)
+            if usr:
+                self.misses += 1
+                pending_definitions.add(usr)
+                tasks.append((_store_task, usr, definition))
+            tasks.append((_visit_task, definition, use_definitions))
+        elif kind == CursorKind.UNEXPOSED_EXPR or kind == CursorKind.ENUM_CONSTANT_DECL:
+            if children:
+                tasks.append((_visit_task, children[0], use_definitions))
+            else:
+                results.append('')
+        elif kind == CursorKind.VAR_DECL:
+            tasks.append((_visit_task, children[-1], use_definitions))
+        elif kind == CursorKind.CSTYLE_CAST_EXPR or kind == CursorKind.CXX_FUNCTIONAL_CAST_EXPR\
+                or kind == CursorKind.CXX_STATIC_CAST_EXPR:
+            cast_type = convert_namespace(children[0].spelling)
+            tasks.append((_combine_task, lambda operand: '({}) {}'.format(cast_type, operand), 1))
+            # the operand of a cast always inserts definitions
+            tasks.append((_visit_task, children[1], True))
+        elif kind == CursorKind.INTEGER_LITERAL or kind == CursorKind.STRING_LITERAL:
+            if cursor.spelling:
+                results.append(cursor.spelling)
+            else:
+                results.append(cursor_tokens[0][1])
         else:
-            return convert_cursor(cursor)
-    elif is_kind(cursor, 'UNEXPOSED_EXPR') or is_kind(cursor, 'ENUM_CONSTANT_DECL'):
-        if children:
-            return _visit_children(children[0], use_definitions)
-        return ''
-    elif is_kind(cursor, 'VAR_DECL'):
-        return _visit_children(children[-1], use_definitions)
-    elif is_kind(cursor, 'CSTYLE_CAST_EXPR') or is_kind(cursor, 'CXX_FUNCTIONAL_CAST_EXPR')\
-            or is_kind(cursor, "CXX_STATIC_CAST_EXPR"):
-        return '({}) {}'.format(convert_namespace(children[0].spelling), _visit_children(children[1]), use_definitions)
-    elif is_kind(cursor, 'INTEGER_LITERAL') or is_kind(cursor, 'STRING_LITERAL'):
-        if cursor.spelling:
-            return cursor.spelling
-        return list(cursor.get_tokens())[0].spelling
-    else:
-        raise TypeError('CursorKind: {} ist not supported!'.format(cursor.kind.name))
+            raise UnsupportedKindError(kind)
+
+
+def get_constant_evaluator(translation_unit: TranslationUnit) -> ConstantEvaluator:
+    """returns the constant evaluator of a translation unit, it is stored on the translation unit to share its lifetime"""
+    constant_evaluator = getattr(translation_unit, '_constant_evaluator', None)
+    if constant_evaluator is None:
+        constant_evaluator = ConstantEvaluator()
+        translation_unit._constant_evaluator = constant_evaluator
+    return constant_evaluator
 
 
 # noinspection SpellCheckingInspection
 def create_struct_prefix(cursor_type: Type) -> str:
     """checks if cursor is a struct and returns respective prefix"""
-    pointee = cursor_type.get_pointee()
-    while is_valid(pointee):
-        cursor_type = pointee
-        pointee = cursor_type.get_pointee()
-    declaration = cursor_type.get_declaration()
-    if is_kind(declaration, 'STRUCT_DECL') or is_kind(declaration, 'CLASS_DECL'):
-        return 'struct '
-    return ''
+    return get_type_converter(cursor_type.translation_unit).resolve(cursor_type)[0]
 
 
 def normalise_link(source: str) -> str:
@@ -392,33 +355,70 @@ def create_namespace_prefix(cursor: Cursor) -> str:
         return ''
     return '_'.join(namespaces) + '_'
 
+
 def create_namespace_prefix_for_type(cursor_type: Type) -> str:
     """gets namespace, formats  prefix and returns it as string"""
     decl_cursor = cursor_type.get_declaration()
-    namespaces = []
-    while decl_cursor:
-        if is_kind(decl_cursor, 'NAMESPACE') or (
-                is_kind(decl_cursor, 'CLASS_DECL') and decl_cursor.spelling != cursor_type.spelling):
-            namespaces.append(decl_cursor.spelling)
-        decl_cursor = decl_cursor.semantic_parent
+    type_spelling = cursor_type.spelling
+    namespaces = [spelling for spelling, is_class in get_scope_cache(decl_cursor.translation_unit)
+                  .get_semantic_scopes(decl_cursor) if not is_class or spelling != type_spelling]
     if not namespaces:
         return ''
-    return '_'.join(reversed(namespaces)) + '_'
+    return '_'.join(namespaces) + '_'
+
 
 def _get_namespaces(cursor: Cursor) -> List[str]:
     """finds cursor's namespace and returns it as string"""
     cursor_definition = cursor.get_definition()
     if cursor_definition:
         cursor = cursor_definition
-    cursor = cursor.lexical_parent
-    namespaces = []
-    while cursor and is_not_kind(cursor, 'TRANSLATION_UNIT'):
-        if cursor.spelling:
-            if not (cursor.spelling.startswith('(unnamed ') or cursor.spelling.startswith('(anonymous ')):
-                namespaces.append(cursor.spelling)
-        cursor = cursor.lexical_parent
-    namespaces.reverse()
-    return namespaces
+    return list(get_scope_cache(cursor.translation_unit).get_lexical_scopes(cursor.lexical_parent))
+
+
+class ScopeCache:
+    """resolves the chain of enclosing scope names once for every scope cursor of a translation unit"""
+
+    def __init__(self):
+        self._lexical_scopes = {}
+        self._semantic_scopes = {}
+
+    def get_lexical_scopes(self, cursor: Cursor) -> Tuple[str, ...]:
+        """returns the names of cursor and its lexical parents from outer to inner, unnamed scopes are skipped"""
+        if cursor is None or cursor.kind == CursorKind.TRANSLATION_UNIT:
+            return ()
+        key = get_cursor_key(cursor)
+        entry = self._lexical_scopes.get(key)
+        if entry is None:
+            scopes = self.get_lexical_scopes(cursor.lexical_parent)
+            spelling = cursor.spelling
+            if spelling and not (spelling.startswith('(unnamed ') or spelling.startswith('(anonymous ')):
+                scopes += (spelling,)
+            # the cursor is stored along with its scopes to keep its translation unit and thus the key valid
+            entry = self._lexical_scopes[key] = (cursor, scopes)
+        return entry[1]
+
+    def get_semantic_scopes(self, cursor: Cursor) -> Tuple[Tuple[str, bool], ...]:
+        """returns name and whether it is a class of all namespaces and classes out of cursor and its semantic parents"""
+        if cursor is None:
+            return ()
+        key = get_cursor_key(cursor)
+        entry = self._semantic_scopes.get(key)
+        if entry is None:
+            scopes = self.get_semantic_scopes(cursor.semantic_parent)
+            kind = cursor.kind
+            if kind == CursorKind.NAMESPACE or kind == CursorKind.CLASS_DECL:
+                scopes += ((cursor.spelling, kind == CursorKind.CLASS_DECL),)
+            entry = self._semantic_scopes[key] = (cursor, scopes)
+        return entry[1]
+
+
+def get_scope_cache(translation_unit: TranslationUnit) -> ScopeCache:
+    """returns the scope cache of a translation unit, it is stored on the translation unit to share its lifetime"""
+    scope_cache = getattr(translation_unit, '_scope_cache', None)
+    if scope_cache is None:
+        scope_cache = ScopeCache()
+        translation_unit._scope_cache = scope_cache
+    return scope_cache
 
 
 # ----- conversion functions -------------------------------------------------------------------------------------------
@@ -432,55 +432,85 @@ def convert_cursor(cursor: Cursor) -> str:
 # noinspection SpellCheckingInspection
 def convert_type(cursor_type: Type) -> str:
     """checks for pointers/const and attaches respective prefix or suffix to returned type string"""
-    num_pointers = 0
-    num_consts = 0
-    pointee = cursor_type.get_pointee()
-    while is_valid(pointee):
-        if cursor_type.is_const_qualified():
-            num_consts += 1
-        if is_kind(cursor_type, 'RVALUEREFERENCE'):
-            num_pointers += 1
-        cursor_type = pointee
-        num_pointers += 1
-        pointee = cursor_type.get_pointee()
-    result = ''
-    if is_kind(cursor_type, 'ELABORATED'):
-        result = create_namespace_prefix_for_type(cursor_type)
-    if cursor_type.is_const_qualified():
-        result = 'const ' + result + re.sub('\\s*const\\s*', '', convert_namespace(cursor_type.spelling))
-    else:
-        result += convert_namespace(cursor_type.spelling)
-    if num_pointers:
-        result += '*' * num_pointers + ' const' * num_consts
-    return result
+    return get_type_converter(cursor_type.translation_unit).resolve(cursor_type)[1]
+
 
 # noinspection SpellCheckingInspection
 def convert_arg_type(cursor_type: Type) -> str:
     """checks for pointers/const/struct and attaches respective prefix or suffix to returned type string"""
-    struct_type = create_struct_prefix(cursor_type)
-    num_pointers = 0
-    num_consts = 0
-    pointee = cursor_type.get_pointee()
-    while is_valid(pointee):
-        if cursor_type.is_const_qualified():
-            num_consts += 1
-        if is_kind(cursor_type, 'RVALUEREFERENCE'):
-            num_pointers += 1
-        cursor_type = pointee
-        num_pointers += 1
+    return get_type_converter(cursor_type.translation_unit).resolve(cursor_type)[2]
+
+
+class TypeConverter:
+    """
+    converts a type in a single walk along its pointee chain into its struct prefix, its type string and its
+    argument type string, the results are cached for every type of a translation unit
+    """
+
+    def __init__(self):
+        self._conversions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, cursor_type: Type) -> Tuple[str, str, str]:
+        """returns struct prefix, converted type and converted argument type"""
+        # the type structure identifies the qualified type including its sugar, the canonical type would merge
+        # typedefs whose spelling is part of the output
+        key = (cursor_type._kind_id, cursor_type.data[0], cursor_type.data[1])
+        conversion = self._conversions.get(key)
+        if conversion is not None:
+            self.hits += 1
+            return conversion[1]
+        self.misses += 1
+        result = self._convert(cursor_type)
+        # the type is stored along with its conversion to keep its translation unit and thus the key valid
+        self._conversions[key] = (cursor_type, result)
+        return result
+
+    @staticmethod
+    def _convert(cursor_type: Type) -> Tuple[str, str, str]:
+        num_pointers = 0
+        num_consts = 0
         pointee = cursor_type.get_pointee()
-    result = ''
-    if is_kind(cursor_type, 'ELABORATED'):
-        result = create_namespace_prefix_for_type(cursor_type)
-    if struct_type:
-        result = struct_type + result
-    if cursor_type.is_const_qualified():
-        result = 'const ' + result + re.sub('\\s*const\\s*', '', convert_namespace(cursor_type.spelling))
-    else:
-        result += convert_namespace(cursor_type.spelling)
-    if num_pointers:
-        result += '*' * num_pointers + ' const' * num_consts
-    return result
+        while is_valid(pointee):
+            if cursor_type.is_const_qualified():
+                num_consts += 1
+            if is_kind(cursor_type, 'RVALUEREFERENCE'):
+                num_pointers += 1
+            cursor_type = pointee
+            num_pointers += 1
+            pointee = cursor_type.get_pointee()
+        declaration_kind = cursor_type.get_declaration().kind
+        struct_prefix = ''
+        if declaration_kind == CursorKind.STRUCT_DECL or declaration_kind == CursorKind.CLASS_DECL:
+            struct_prefix = 'struct '
+        namespace_prefix = ''
+        if is_kind(cursor_type, 'ELABORATED'):
+            namespace_prefix = create_namespace_prefix_for_type(cursor_type)
+        pointer_suffix = ''
+        if num_pointers:
+            pointer_suffix = '*' * num_pointers + ' const' * num_consts
+        if cursor_type.is_const_qualified():
+            spelling = re.sub('\\s*const\\s*', '', convert_namespace(cursor_type.spelling)) + pointer_suffix
+            return (struct_prefix, 'const ' + namespace_prefix + spelling,
+                    'const ' + struct_prefix + namespace_prefix + spelling)
+        spelling = convert_namespace(cursor_type.spelling) + pointer_suffix
+        return struct_prefix, namespace_prefix + spelling, struct_prefix + namespace_prefix + spelling
+
+    def report(self) -> str:
+        """returns a summary of cache hits and misses"""
+        total = self.hits + self.misses
+        return 'Type conversions: {} hits, {} misses ({:.0%} hit rate)'.format(self.hits, self.misses,
+                                                                             self.hits / total if total else 0)
+
+
+def get_type_converter(translation_unit: TranslationUnit) -> TypeConverter:
+    """returns the type converter of a translation unit, it is stored on the translation unit to share its lifetime"""
+    type_converter = getattr(translation_unit, '_type_converter', None)
+    if type_converter is None:
+        type_converter = TypeConverter()
+        translation_unit._type_converter = type_converter
+    return type_converter
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -488,304 +518,823 @@ def convert_arg_type(cursor_type: Type) -> str:
 # ----------------------------------------------------------------------------------------------------------------------
 
 
+platforms = (None, 'com', 'non-com')
+
+
+class OutputVariant:
+    """
+    flavour of the generated header, any number of variants can be rendered from the same parsed model,
+    the com platform resolves all conditional blocks as on Windows, the non-com platform as anywhere else,
+    nested vtables embed the vtable of a single direct base class instead of repeating its methods
+    """
+
+    def __init__(self, file_name: str = 'vst3_c_api.h', banners: bool = True, source_comments: bool = True,
+                 platform: str = None, nested_vtables: bool = False):
+        if platform not in platforms:
+            raise ValueError('Unknown platform: {}'.format(platform))
+        self.file_name = file_name
+        self.banners = banners
+        self.source_comments = source_comments
+        self.platform = platform
+        self.nested_vtables = nested_vtables
+
+
+default_variant = OutputVariant()
+output_variants = {
+    'full': default_variant,
+    'compact': OutputVariant('vst3_c_api_compact.h', banners=False, source_comments=False),
+    'com': OutputVariant('vst3_c_api_com.h', platform='com'),
+    'non-com': OutputVariant('vst3_c_api_non_com.h', platform='non-com'),
+    'nested': OutputVariant('vst3_c_api_nested.h', nested_vtables=True)
+}
+
+license_lines = [
+    "/*-----------------------------------------------------------------------------\n",
+    " This file is part of a Steinberg SDK. It is subject to the license terms\n",
+    " in the LICENSE file found in the top-level directory of this distribution\n",
+    " and at www.steinberg.net/sdklicenses. \n",
+    " No part of the SDK, including this file, may be copied, modified, propagated,\n",
+    " or distributed except according to the terms contained in the LICENSE file.\n",
+    "-----------------------------------------------------------------------------*/\n"
+]
+
+_vtable_assert_lines = [
+    "#include <stddef.h>\n",
+    "\n",
+    "#ifdef __cplusplus\n",
+    "#define SMTG_VTBL_ASSERT(condition) static_assert(condition, #condition)\n",
+    "#else\n",
+    "#define SMTG_VTBL_ASSERT(condition) _Static_assert(condition, #condition)\n",
+    "#endif\n",
+    "\n"
+]
+
+_calling_convention_lines = [
+    "#define SMTG_STDMETHODCALLTYPE __stdcall\n",
+    "#define SMTG_COM_COMPATIBLE 1\n"
+]
+
+_other_calling_convention_lines = [
+    "#define SMTG_STDMETHODCALLTYPE\n",
+    "#define SMTG_COM_COMPATIBLE 0\n"
+]
+
+# noinspection SpellCheckingInspection
+_inline_uid_lines = [
+    "#define SMTG_INLINE_UID(l1, l2, l3, l4) \\\n",
+    "{ \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x000000FF)      ), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x0000FF00) >>  8), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x00FF0000) >> 16), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0xFF000000) >> 24), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x00FF0000) >> 16), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0xFF000000) >> 24), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x000000FF)      ), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x0000FF00) >>  8), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x000000FF)      ), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x000000FF)      )  \\\n",
+    "}\n"
+]
+
+# noinspection SpellCheckingInspection
+_other_inline_uid_lines = [
+    "#define SMTG_INLINE_UID(l1, l2, l3, l4) \\\n",
+    "{ \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x000000FF)      ), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x000000FF)      ), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x000000FF)      ), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x00FF0000) >> 16), \\\n",
+    "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x000000FF)      )  \\\n",
+    "}\n"
+]
+
+_result_value_lines = [
+    "static const Steinberg_tresult Steinberg_kNoInterface = 0x80004002L;\n",
+    "static const Steinberg_tresult Steinberg_kResultOk = 0x00000000L;\n",
+    "static const Steinberg_tresult Steinberg_kResultTrue = 0x00000000L;\n",
+    "static const Steinberg_tresult Steinberg_kResultFalse = 0x00000001L;\n",
+    "static const Steinberg_tresult Steinberg_kInvalidArgument = 0x80070057L;\n",
+    "static const Steinberg_tresult Steinberg_kNotImplemented = 0x80004001L;\n",
+    "static const Steinberg_tresult Steinberg_kInternalError = 0x80004005L;\n",
+    "static const Steinberg_tresult Steinberg_kNotInitialized = 0x8000FFFFL;\n",
+    "static const Steinberg_tresult Steinberg_kOutOfMemory = 0x8007000EL;\n",
+    "\n"
+]
+
+_other_result_value_lines = [
+    "static const Steinberg_tresult Steinberg_kNoInterface = -1;\n",
+    "static const Steinberg_tresult Steinberg_kResultOk = 0;\n",
+    "static const Steinberg_tresult Steinberg_kResultTrue = 0;\n",
+    "static const Steinberg_tresult Steinberg_kResultFalse = 1;\n",
+    "static const Steinberg_tresult Steinberg_kInvalidArgument = 2;\n",
+    "static const Steinberg_tresult Steinberg_kNotImplemented = 3;\n",
+    "static const Steinberg_tresult Steinberg_kInternalError = 4;\n",
+    "static const Steinberg_tresult Steinberg_kNotInitialized = 5;\n",
+    "static const Steinberg_tresult Steinberg_kOutOfMemory = 6;\n"
+]
+
+
+def iter_banner(title: str, variant: OutputVariant):
+    """yields the banner of a section, unless the variant omits banners"""
+    if variant.banners:
+        yield "/*----------------------------------------------------------------------------------------------------------------------\n"
+        yield "----- {} {}\n".format(title, '-' * (113 - len(title)))
+        yield "----------------------------------------------------------------------------------------------------------------------*/\n"
+        yield "\n"
+
+
+def _iter_source_comment(source_location: str, variant: OutputVariant):
+    if variant.source_comments:
+        yield "/*----------------------------------------------------------------------------------------------------------------------\n"
+        yield "{} */\n".format(source_location)
+        yield "\n"
+
+
+def _iter_platform_block(condition: str, com_lines: List[str], other_lines: List[str], variant: OutputVariant):
+    """yields a conditional block, variants for a specific platform only get the lines of that platform"""
+    if variant.platform is None:
+        yield "#if {}\n".format(condition)
+        yield from com_lines
+        yield "#else\n"
+        yield from other_lines
+        yield "#endif\n"
+    elif variant.platform == 'com':
+        yield from com_lines
+    else:
+        yield from other_lines
+
+
 # noinspection SpellCheckingInspection
+def iter_standard(variant: OutputVariant = default_variant):
+    """yields standard content for converted header, irrespective of parsed header file"""
+    yield from license_lines
+    yield "\n"
+    yield "/* This file is the autogenerated C API of the VST3 SDK */\n"
+    yield "\n"
+    yield "#pragma once\n"
+    yield "\n"
+    yield "#include <stdint.h>\n"
+    yield "\n"
+    if variant.nested_vtables:
+        yield from _vtable_assert_lines
+    yield from _iter_platform_block('_WIN32', _calling_convention_lines, _other_calling_convention_lines, variant)
+    yield "\n"
+    yield "#ifndef __cplusplus\n"
+    yield "typedef int16_t char16_t;\n"
+    yield "#endif\n"
+    yield "\n"
+    yield from _iter_platform_block('SMTG_COM_COMPATIBLE', _inline_uid_lines, _other_inline_uid_lines, variant)
+    yield "\n"
+
+
+def iter_typedefs(typedefs_list: Container, comment: str, variant: OutputVariant = default_variant):
+    """yields formatted typedefs for converted header"""
+    yield from iter_banner(comment, variant)
+    for typedef in typedefs_list:
+        yield "{}\n".format(typedef)
+    yield "\n\n"
+
+
+# noinspection SpellCheckingInspection
+def iter_return_types(variant: OutputVariant = default_variant):
+    """yields further standard content for converted header"""
+    yield from iter_banner('Result value definitions', variant)
+    yield from _iter_platform_block('SMTG_COM_COMPATIBLE', _result_value_lines, _other_result_value_lines, variant)
+    yield "\n\n"
+
+
+def _iter_vtable_asserts(interface: Interface, nested_base: bool):
+    """yields static asserts that a vtable has the layout of the flat list of all its function pointers"""
+    method_count = len(interface.methods) + sum(len(base_class.methods) for base_class in interface.base_classes)
+    if nested_base and interface.methods:
+        yield "SMTG_VTBL_ASSERT(offsetof(struct {}Vtbl, {}) == sizeof(struct {}Vtbl));\n".format(
+            interface.name, interface.methods[0].name, interface.direct_base_classes[0].name)
+    yield "SMTG_VTBL_ASSERT(sizeof(struct {}Vtbl) == {} * sizeof(void (*)(void)));\n".format(interface.name,
+                                                                                        method_count)
+    yield "\n"
+
+
+# noinspection SpellCheckingInspection
+def render_method(method: Method) -> str:
+    """formats a method as function pointer of an interface vtable"""
+    parameters = ''.join(f', {parameter.type} {parameter.name}' for parameter in method.parameters)
+    return f'{method.return_type} (SMTG_STDMETHODCALLTYPE* {method.name}) (void* thisInterface{parameters});'
+
+
 def generate_standard():
     """generates standard content for converted header, irrespective of parsed header file, returns string"""
-    string =  "/*-----------------------------------------------------------------------------\n"
-    string += " This file is part of a Steinberg SDK. It is subject to the license terms\n"
-    string += " in the LICENSE file found in the top-level directory of this distribution\n"
-    string += " and at www.steinberg.net/sdklicenses. \n"
-    string += " No part of the SDK, including this file, may be copied, modified, propagated,\n"
-    string += " or distributed except according to the terms contained in the LICENSE file.\n"
-    string += "-----------------------------------------------------------------------------*/\n"
-    string += "\n"
-    string += "/* This file is the autogenerated C API of the VST3 SDK */\n"
-    string += "\n"
-    string += "#pragma once\n"
-    string += "\n"
-    string += "#include <stdint.h>\n"
-    string += "\n"
-    string += "#if _WIN32\n"
-    string += "#define SMTG_STDMETHODCALLTYPE __stdcall\n"
-    string += "#define SMTG_COM_COMPATIBLE 1\n"
-    string += "#else\n"
-    string += "#define SMTG_STDMETHODCALLTYPE\n"
-    string += "#define SMTG_COM_COMPATIBLE 0\n"
-    string += "#endif\n"
-    string += "\n"
-    string += "#ifndef __cplusplus\n"
-    string += "typedef int16_t char16_t;\n"
-    string += "#endif\n"
-    string += "\n"
-    string += "#if SMTG_COM_COMPATIBLE\n"
-    string += "#define SMTG_INLINE_UID(l1, l2, l3, l4) \\\n"
-    string += "{ \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x000000FF)      ), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x0000FF00) >>  8), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x00FF0000) >> 16), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0xFF000000) >> 24), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x00FF0000) >> 16), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0xFF000000) >> 24), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x000000FF)      ), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x0000FF00) >>  8), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x000000FF)      ), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x000000FF)      )  \\\n"
-    string += "}\n"
-    string += "#else\n"
-    string += "#define SMTG_INLINE_UID(l1, l2, l3, l4) \\\n"
-    string += "{ \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l1) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l1) & 0x000000FF)      ), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l2) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l2) & 0x000000FF)      ), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l3) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l3) & 0x000000FF)      ), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0xFF000000) >> 24), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x00FF0000) >> 16), \\\n"
-    string += "	(Steinberg_int8)(((Steinberg_uint32)(l4) & 0x0000FF00) >>  8), (Steinberg_int8)(((Steinberg_uint32)(l4) & 0x000000FF)      )  \\\n"
-    string += "}\n"
-    string += "#endif\n"
-    string += "\n"
-    return string
+    return ''.join(iter_standard())
 
 
 def generate_typedefs(typedefs_list: Container, comment: str):
     """generates formatted typedefs for converted header, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- {} {}\n".format(comment, '-' * (113 - len(comment)))
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for typedef in typedefs_list:
-        string += "{}\n".format(typedef)
-    string += "\n\n"
-    return string
-
-
-def generate_forward():
-    """generates formatted forward declarations for converted header, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Interface forward declarations -----------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for forward_interface in interfaces:
-        string += "struct {};\n".format(forward_interface.name)
-    string += "\n"
-    string += "\n"
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Struct forward declarations --------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for forward_struct in structs:
-        string += "struct {};\n".format(forward_struct.name)
-    string += "\n\n"
-    return string
+    return ''.join(iter_typedefs(typedefs_list, comment))
 
 
 # noinspection SpellCheckingInspection
 def generate_return_types():
     """generates further standard content for converted header, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Result value definitions -----------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    string += "#if SMTG_COM_COMPATIBLE\n"
-    string += "static const Steinberg_tresult Steinberg_kNoInterface = 0x80004002L;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultOk = 0x00000000L;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultTrue = 0x00000000L;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultFalse = 0x00000001L;\n"
-    string += "static const Steinberg_tresult Steinberg_kInvalidArgument = 0x80070057L;\n"
-    string += "static const Steinberg_tresult Steinberg_kNotImplemented = 0x80004001L;\n"
-    string += "static const Steinberg_tresult Steinberg_kInternalError = 0x80004005L;\n"
-    string += "static const Steinberg_tresult Steinberg_kNotInitialized = 0x8000FFFFL;\n"
-    string += "static const Steinberg_tresult Steinberg_kOutOfMemory = 0x8007000EL;\n"
-    string += "\n"
-    string += "#else\n"
-    string += "static const Steinberg_tresult Steinberg_kNoInterface = -1;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultOk = 0;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultTrue = 0;\n"
-    string += "static const Steinberg_tresult Steinberg_kResultFalse = 1;\n"
-    string += "static const Steinberg_tresult Steinberg_kInvalidArgument = 2;\n"
-    string += "static const Steinberg_tresult Steinberg_kNotImplemented = 3;\n"
-    string += "static const Steinberg_tresult Steinberg_kInternalError = 4;\n"
-    string += "static const Steinberg_tresult Steinberg_kNotInitialized = 5;\n"
-    string += "static const Steinberg_tresult Steinberg_kOutOfMemory = 6;\n"
-    string += "#endif\n"
-    string += "\n\n"
-    return string
+    return ''.join(iter_return_types())
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# ----- conversion session ---------------------------------------------------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ConversionSession:
+    """
+    owns all storage structures of one conversion together with the parse and generator functions working on them,
+    independent sessions can be used concurrently or kept alive between conversions
+    """
+
+    def __init__(self, blocklist: List[str] = None, enum_mode: str = 'expression'):
+        if enum_mode not in enum_modes:
+            raise ValueError('Unknown enum mode: {}'.format(enum_mode))
+        self.interfaces = Container()
+        self.unions = Container()
+        self.structs = Container()
+        self.enums = Container()
+        self.typedefs = Container()
+        self.interface_typedefs = Container()
+        self.variables = Container()
+        self.blocklist = list(default_blocklist if blocklist is None else blocklist)
+        self.enum_mode = enum_mode
+        self.file_ranges = []
+        self.skipped_variables = []
+        self._declaration_handlers = {
+            CursorKind.CLASS_DECL: self._parse_class_decl,
+            CursorKind.ENUM_DECL: self._parse_enum_decl,
+            CursorKind.STRUCT_DECL: self._parse_struct_decl,
+            CursorKind.VAR_DECL: self._parse_var_decl,
+            CursorKind.TYPEDEF_DECL: lambda cursor, namespace: _store_typedef_decl(cursor, self.typedefs),
+            CursorKind.TYPE_ALIAS_DECL: lambda cursor, namespace: _store_typedef_decl(cursor, self.typedefs)
+        }
+        self._interface_member_handlers = {
+            CursorKind.TYPEDEF_DECL: lambda cursor, interface: _store_typedef_decl(cursor, self.interface_typedefs),
+            CursorKind.TYPE_ALIAS_DECL: lambda cursor, interface: _store_typedef_decl(cursor, self.interface_typedefs),
+            CursorKind.ENUM_DECL: lambda cursor, interface: self._parse_enum_decl(cursor),
+            CursorKind.CXX_BASE_SPECIFIER: self._parse_base_specifier,
+            CursorKind.VAR_DECL: lambda cursor, interface: self._parse_variable_decl(cursor),
+            CursorKind.CXX_METHOD: _parse_method_decl
+        }
+
+    def get_storage_sizes(self) -> Dict[str, int]:
+        """returns the current number of elements of each storage structure"""
+        return {name: len(getattr(self, name)) for name in storage_names}
+
+    def clear(self):
+        """clears all used storage structures"""
+        self.interfaces.clear()
+        self.unions.clear()
+        self.structs.clear()
+        self.enums.clear()
+        self.typedefs.clear()
+        self.interface_typedefs.clear()
+        self.variables.clear()
+        self.file_ranges.clear()
+        self.skipped_variables.clear()
+
+    def finalize(self) -> List[str]:
+        """
+        linearizes the base classes of all interfaces, returns warnings about diamond and duplicate base classes,
+        interfaces which are already linearized are not linearized again
+        """
+        warnings = []
+        for interface in self.interfaces:
+            for base_class in interface.duplicate_bases:
+                warnings.append('{} derives from {} more than once'.format(interface.name, base_class.name))
+            for base_class in interface.diamond_bases:
+                warnings.append('{} inherits {} through more than one base class'.format(interface.name,
+                                                                                        base_class.name))
+        skipped_reasons = Counter(reason for name, reason in self.skipped_variables)
+        for reason, count in sorted(skipped_reasons.items()):
+            warnings.append('{} variables skipped, {}'.format(count, reason))
+        return warnings
+
+    # ----- parsing functions ------------------------------------------------------------------------------------------
+
+    def parse_header(self, cursor: Cursor):
+        """excludes unusable parts and executes parse functions"""
+        if is_not_kind(cursor, 'TRANSLATION_UNIT'):
+            return
+        root_path = normalise_link(str(Path(cursor.spelling).parents[2]))
+        already_parsed_includes = []
+        for cursor_child in cursor.get_children():
+            cursor_child_location = normalise_link(cursor_child.location.file.name)
+            if not cursor_child_location.startswith(root_path) or cursor_child_location in already_parsed_includes:
+                continue
+            already_parsed_includes.append(cursor_child_location)
+            storage_sizes = self.get_storage_sizes()
+            self._dispatch(cursor_child)
+            source_file = cursor_child_location[len(root_path):].lstrip('/')
+            self.file_ranges.append((source_file, storage_sizes, self.get_storage_sizes()))
+
+    def _dispatch(self, cursor: Cursor, namespace: str = ''):
+        """reads the cursor kind once and routes the cursor to the namespace or the matching declaration handler"""
+        kind = cursor.kind
+        if kind == CursorKind.NAMESPACE:
+            self._parse_namespace_children(cursor, namespace)
+            return
+        handler = self._declaration_handlers.get(kind)
+        if handler:
+            handler(cursor, namespace)
+
+    def parse_namespace(self, cursor: Cursor, namespace: str = '') -> bool:
+        """recursively parses namespaces and executes parse functions"""
+        if is_not_kind(cursor, 'NAMESPACE'):
+            return False
+        self._parse_namespace_children(cursor, namespace)
+        return True
+
+    def _parse_namespace_children(self, cursor: Cursor, namespace: str):
+        if namespace:
+            namespace += '::'
+        namespace += cursor.spelling
+        for cursor_child in cursor.get_children():
+            self._dispatch(cursor_child, namespace)
+
+    def parsing(self, cursor: Cursor, namespace: str = ''):
+        """executes the parse function matching the cursor kind"""
+        handler = self._declaration_handlers.get(cursor.kind)
+        if handler:
+            handler(cursor, namespace)
+
+    # noinspection SpellCheckingInspection
+    def parse_interfaces(self, cursor):
+        """executes all specific interface-related parse functions and stores information"""
+        if is_not_kind(cursor, 'CLASS_DECL'):
+            return
+        self._parse_class_decl(cursor)
+
+    def _parse_class_decl(self, cursor: Cursor, namespace: str = ''):
+        if cursor.spelling in self.blocklist:
+            return
+        children = list(cursor.get_children())
+        if not children:
+            return
+        interface = Interface(convert_cursor(cursor), get_cursor_location(cursor.location), cursor.brief_comment)
+        for cursor_child in children:
+            handler = self._interface_member_handlers.get(cursor_child.kind)
+            if handler:
+                handler(cursor_child, interface)
+        self.interfaces.append(interface)
+
+    def parse_inheritance(self, cursor: Cursor, interface: Interface):
+        """parses and stores information about interface inheritance"""
+        if is_not_kind(cursor, 'CXX_BASE_SPECIFIER'):
+            return
+        self._parse_base_specifier(cursor, interface)
+
+    def _parse_base_specifier(self, cursor: Cursor, interface: Interface):
+        base_type = cursor.type
+        base_interface_name = ''
+        if is_kind(base_type, 'ELABORATED'):
+            base_interface_name = create_namespace_prefix_for_type(base_type)
+        base_interface_name += convert_namespace(base_type.spelling)
+        if base_interface_name in self.interfaces:
+            interface.add_base_class(self.interfaces[base_interface_name])
+
+    # noinspection SpellCheckingInspection
+    def parse_iid(self, cursor: Cursor, namespace: str):
+        """parses and stores IIDs of interfaces"""
+        if is_not_kind(cursor, 'VAR_DECL') or not cursor.spelling.endswith('_iid'):
+            return
+        self._parse_iid_decl(cursor, namespace)
+
+    def _parse_iid_decl(self, cursor: Cursor, namespace: str):
+        id_tokens = get_token_spellings_from_extent(cursor)
+        interface_name = convert_namespace(namespace)
+        if interface_name:
+            interface_name += '_'
+        interface_name += id_tokens[2]
+        if interface_name in self.interfaces:
+            self.interfaces[interface_name].set_iid(id_tokens[4], id_tokens[6], id_tokens[8], id_tokens[10])
+
+    def _parse_var_decl(self, cursor: Cursor, namespace: str = ''):
+        """a variable declaration may both define an IID and a variable"""
+        if cursor.spelling.endswith('_iid'):
+            self._parse_iid_decl(cursor, namespace)
+        self._parse_variable_decl(cursor)
+
+    # noinspection SpellCheckingInspection
+    def parse_variables(self, cursor):
+        """parses and stores variable definition information"""
+        if is_not_kind(cursor, 'VAR_DECL'):
+            return
+        self._parse_variable_decl(cursor)
+
+    # noinspection SpellCheckingInspection
+    def _parse_variable_decl(self, cursor: Cursor):
+        cursor_type = cursor.type
+        if is_not_kind(cursor_type, 'ELABORATED') and is_not_kind(cursor_type, 'TYPEDEF'):
+            return
+        if is_kind(cursor_type, 'ELABORATED') and (cursor.displayname == 'iid' or
+                                                   cursor.displayname.endswith('_iid') or is_kind(
+                    cursor_type.get_canonical(), 'RECORD')):
+            return
+        try:
+            variable_value = _visit_children(list(cursor.get_children())[-1])
+        except UnsupportedKindError as error:
+            self.skipped_variables.append((convert_cursor(cursor), 'unsupported {}'.format(error.kind.name)))
+            return
+        except CyclicDefinitionError:
+            self.skipped_variables.append((convert_cursor(cursor), 'cyclic definition'))
+            return
+        self.variables.append(Variable(convert_cursor(cursor), convert_type(cursor_type), variable_value))
+
+    # noinspection SpellCheckingInspection
+    def parse_structs(self, cursor):
+        """parses, formats and stores struct information, executes union parse function"""
+        if is_not_kind(cursor, 'STRUCT_DECL'):
+            return
+        self._parse_struct_decl(cursor)
+
+    # noinspection SpellCheckingInspection
+    def _parse_struct_decl(self, cursor: Cursor, namespace: str = ''):
+        if cursor.spelling in self.blocklist:
+            return
+        children = list(cursor.get_children())
+        if not children:
+            # this is only a forward declaration
+            return
+        struct_name = convert_cursor(cursor)
+        fields = []
+        for cursor_child in children:
+            kind = cursor_child.kind
+            if kind == CursorKind.UNION_DECL:
+                self._parse_union_decl(struct_name, cursor_child)
+            elif kind == CursorKind.ENUM_DECL:
+                self._parse_enum_decl(cursor_child)
+            elif kind == CursorKind.FIELD_DECL:
+                fields.append(_convert_field_decl(cursor_child))
+        if fields:
+            struct = Struct(struct_name, get_cursor_location(cursor.location))
+            for field in fields:
+                struct.add_member(field)
+            self.structs.append(struct)
+
+    # noinspection SpellCheckingInspection
+    def parse_union(self, parent, cursor):
+        """parses and stores union information within a struct"""
+        if is_not_kind(cursor, 'UNION_DECL'):
+            return
+        self._parse_union_decl(parent, cursor)
+
+    def _parse_union_decl(self, parent: str, cursor: Cursor):
+        if cursor.spelling in self.blocklist:
+            return
+        children = list(cursor.get_children())
+        if not children:
+            # this is only a forward declaration
+            return
+        union = Union(parent)
+        for cursor_child in children:
+            if is_not_kind(cursor_child, 'FIELD_DECL'):
+                continue
+            member_type = cursor_child.type
+            member_return_type = create_struct_prefix(member_type) + convert_type(member_type)
+            union.add_member('{} {}'.format(member_return_type, convert_cursor(cursor_child)))
+        self.unions.append(union)
+
+    # noinspection SpellCheckingInspection
+    def parse_enum(self, cursor: Cursor) -> bool:
+        """parses and stores enum information"""
+        if is_not_kind(cursor, 'ENUM_DECL'):
+            return False
+        self._parse_enum_decl(cursor)
+        return True
+
+    def _parse_enum_decl(self, cursor: Cursor, namespace: str = ''):
+        if not cursor.spelling or cursor.spelling.startswith('(unnamed enum'):
+            return
+        enum = Enum(convert_cursor(cursor), get_cursor_location(cursor.location))
+        for cursor_child in cursor.get_children():
+            if is_not_kind(cursor_child, 'ENUM_CONSTANT_DECL'):
+                continue
+            enumerator_name = create_namespace_prefix(cursor_child) + cursor_child.spelling
+            enum.add_enumerator(enumerator_name, self._convert_enumerator_value(cursor_child))
+        self.enums.append(enum)
+
+    def _convert_enumerator_value(self, cursor: Cursor) -> str:
+        """returns the initializer of an enumerator as written, or its value as computed by libclang"""
+        if self.enum_mode == 'value':
+            return str(cursor.enum_value)
+        try:
+            return _visit_children(cursor, use_definitions=False)
+        except UnsupportedKindError:
+            # expressions of unsupported kinds are replaced by their value
+            return str(cursor.enum_value)
+
+    # ----- generator functions ----------------------------------------------------------------------------------------
+
+    def iter_forward(self, variant: OutputVariant = default_variant):
+        """yields formatted forward declarations for converted header"""
+        yield from iter_banner('Interface forward declarations', variant)
+        for forward_interface in self.interfaces:
+            yield "struct {};\n".format(forward_interface.name)
+        yield "\n"
+        yield "\n"
+        yield from iter_banner('Struct forward declarations', variant)
+        for forward_struct in self.structs:
+            yield "struct {};\n".format(forward_struct.name)
+        yield "\n\n"
+
+    def iter_enums(self, variant: OutputVariant = default_variant):
+        """yields formatted enums for converted header"""
+        yield from iter_banner('Enums', variant)
+        for enum in self.enums:
+            yield from _iter_source_comment(enum.source_location, variant)
+            yield "typedef enum\n"
+            yield "{\n"
+            yield ",\n".join([f'    {enumerator}' for enumerator in enum.enumerators])
+            yield "\n"
+            yield "}} {};\n".format(enum.name)
+            yield "\n"
+        yield "\n"
+
+    def iter_variables(self, variant: OutputVariant = default_variant):
+        """yields formatted variables for converted header"""
+        yield from iter_banner('Variable declarations', variant)
+        for variable in self.variables:
+            yield "{}\n".format(variable)
+        yield "\n\n"
+
+    def iter_union(self, parent):
+        """yields formatted unions within structs for converted header"""
+        if parent in self.unions:
+            union = self.unions[parent]
+            yield "    union\n    {\n"
+            for member in union.members:
+                yield "        {};\n".format(member)
+            yield "    };\n"
+
+    def iter_structs(self, variant: OutputVariant = default_variant):
+        """yields formatted structs for converted header, executes union generator function"""
+        yield from iter_banner('Structs', variant)
+        for struct in self.structs:
+            yield from _iter_source_comment(struct.source_location, variant)
+            yield "struct {}\n{{\n".format(struct.name)
+            for field in struct.members:
+                yield "    {}\n".format(field)
+            yield from self.iter_union(struct.name)
+            yield "};\n"
+            yield "\n"
+        yield "\n"
+
+    # noinspection SpellCheckingInspection
+    def iter_interface(self, variant: OutputVariant = default_variant):
+        """yields formatted interfaces for converted header, executes method generator function"""
+        yield from iter_banner('Interfaces', variant)
+        for interface in self.interfaces:
+            yield from _iter_source_comment(interface.source_location, variant)
+            yield "typedef struct {}Vtbl\n".format(interface.name)
+            yield "{\n"
+            # a single direct base class is laid out exactly like its own vtable, so it can be embedded
+            nested_base = variant.nested_vtables and len(interface.direct_base_classes) == 1
+            if nested_base:
+                base_class = interface.direct_base_classes[0]
+                yield "    /* methods derived from \"{}\": */\n".format(base_class.name)
+                yield "    struct {}Vtbl base;\n".format(base_class.name)
+                yield "\n"
+            else:
+                for base_class in interface.base_classes:
+                    yield "    /* methods derived from \"{}\": */\n".format(base_class.name)
+                    yield "\n".join(['    ' + render_method(method) for method in base_class.methods])
+                    yield "\n\n"
+            if interface.methods:
+                yield "    /* methods defined in \"{}\": */\n".format(interface.name)
+                yield "\n".join(['    ' + render_method(method) for method in interface.methods])
+                yield "\n\n"
+            yield "{} {}Vtbl;\n".format("}", interface.name)
+            yield "\n"
+            if variant.nested_vtables:
+                yield from _iter_vtable_asserts(interface, nested_base)
+            yield "typedef struct {}\n".format(interface.name)
+            yield "{\n"
+            yield "    struct {}Vtbl* lpVtbl;\n".format(interface.name)
+            yield "{} {};\n".format("}", interface.name)
+            if interface.iid:
+                yield "\n"
+                yield "{}\n".format(interface.iid)
+            yield "\n"
+
+    def iter_conversion(self, variant: OutputVariant = default_variant):
+        """executes individual generator functions, yields the converted header in chunks"""
+        yield from iter_standard(variant)
+        yield from iter_typedefs(self.typedefs, 'Typedefs', variant)
+        yield from self.iter_forward(variant)
+        yield from iter_return_types(variant)
+        yield from iter_typedefs(self.interface_typedefs, 'Interface typedefs', variant)
+        yield from self.iter_enums(variant)
+        yield from self.iter_variables(variant)
+        yield from self.iter_structs(variant)
+        yield from self.iter_interface(variant)
+
+    def write_conversion(self, writer: TextIO, variant: OutputVariant = default_variant):
+        """streams the converted header into writer, e.g. a file, io.StringIO or the file object of a socket"""
+        for chunk in self.iter_conversion(variant):
+            writer.write(chunk)
+
+    def write_variants(self, variants: List[OutputVariant], output_directory: Path) -> List[Path]:
+        """
+        writes every variant of the converted header from the parsed model, returns the written files,
+        files whose content did not change are left untouched
+        """
+        output_paths = []
+        for variant in variants:
+            output_path = Path(output_directory) / variant.file_name
+            write_if_changed(output_path, lambda writer: self.write_conversion(writer, variant))
+            output_paths.append(output_path)
+        return output_paths
+
+    def generate_forward(self):
+        """generates formatted forward declarations for converted header, returns string"""
+        return ''.join(self.iter_forward())
+
+    def generate_enums(self):
+        """generates formatted enums for converted header, returns string"""
+        return ''.join(self.iter_enums())
+
+    def generate_variables(self):
+        """generates formatted variables for converted header, returns string"""
+        return ''.join(self.iter_variables())
+
+    def generate_union(self, parent):
+        """generates formatted unions within structs for converted header, returns string"""
+        return ''.join(self.iter_union(parent))
+
+    def generate_structs(self):
+        """generates formatted structs for converted header, executes union generator function, returns string"""
+        return ''.join(self.iter_structs())
+
+    def generate_interface(self):
+        """generates formatted interfaces for converted header, executes method generator function, returns string"""
+        return ''.join(self.iter_interface())
+
+    def generate_conversion(self, variant: OutputVariant = default_variant):
+        """executes individual generator functions, returns finalised string"""
+        return ''.join(self.iter_conversion(variant))
+
+    def print_info(self):
+        """prints information about header file, not necessary for generator process"""
+        print("Number of enums: {}".format(len(self.enums)))
+        for enum in self.enums:
+            print(" {}".format(enum.name))
+        print()
+        print("Number of structs: {}".format(len(self.structs)))
+        for struct in self.structs:
+            print(" {}".format(struct.name))
+        print()
+        print("Number of interfaces: {}".format(len(self.interfaces)))
+        print()
+        for index, interface in enumerate(self.interfaces):
+            print("Interface {}: {}".format(index + 1, interface.name))
+            print(interface.source_location)
+            print("Info:", interface.description)
+            print("Methods:")
+            for method in interface.methods:
+                print(" {}".format(method.name))
+            print()
+        print()
+
+
+# ----- default session ------------------------------------------------------------------------------------------------
+
+"""the module-level functions below operate on this session and keep the former script interface working"""
+default_blocklist = ["FUID", "FReleaser"]
+enum_modes = ('expression', 'value')
+_default_session = ConversionSession()
+
+interfaces = _default_session.interfaces
+unions = _default_session.unions
+structs = _default_session.structs
+enums = _default_session.enums
+typedefs = _default_session.typedefs
+interface_typedefs = _default_session.interface_typedefs
+variables = _default_session.variables
+blocklist = _default_session.blocklist
+
+
+def convert(pluginterfaces_path: Path, clang_args: List[str] = None, session: ConversionSession = None,
+            profile: str = 'default') -> ConversionSession:
+    """
+    parses a pluginterfaces checkout without writing to it, the header compilation is rendered in memory and handed
+    to libclang as unsaved file, returns the finalized session holding the parsed model, its warnings are reported
+    on stderr
+    """
+    if session is None:
+        session = ConversionSession()
+    header_path = get_header_compilation_path(Path(pluginterfaces_path))
+    translation_unit = create_translation_unit(header_path, normalise_link(str(header_path.parents[2])), clang_args,
+                                               unsaved_files=[(str(header_path),
+                                                               render_header_compilation(Path(pluginterfaces_path)))],
+                                               profile=profile)
+    session.parse_header(translation_unit.cursor)
+    print_warnings(session.finalize())
+    return session
+
+
+def print_warnings(warnings: List[str]):
+    """reports the warnings of a finalized session"""
+    for warning in warnings:
+        print('Warning: {}'.format(warning), file=sys.stderr)
+
+
+def clear_arrays():
+    """clears all used storage structures"""
+    _default_session.clear()
+
+
+def parse_header(cursor: Cursor):
+    """excludes unusable parts and executes parse functions"""
+    _default_session.parse_header(cursor)
+
+
+def parse_namespace(cursor: Cursor, namespace: str = '') -> bool:
+    """recursively parses namespaces and executes parse functions"""
+    return _default_session.parse_namespace(cursor, namespace)
+
+
+def parsing(cursor: Cursor, namespace: str = ''):
+    """executes specific parse functions"""
+    _default_session.parsing(cursor, namespace)
+
+
+def parse_interfaces(cursor):
+    """executes all specific interface-related parse functions and stores information"""
+    _default_session.parse_interfaces(cursor)
+
+
+def parse_inheritance(cursor: Cursor, interface: Interface):
+    """parses and stores information about interface inheritance"""
+    _default_session.parse_inheritance(cursor, interface)
+
+
+def parse_iid(cursor: Cursor, namespace: str):
+    """parses and stores IIDs of interfaces"""
+    _default_session.parse_iid(cursor, namespace)
+
+
+def parse_variables(cursor):
+    """parses and stores variable definition information"""
+    _default_session.parse_variables(cursor)
+
+
+def parse_structs(cursor):
+    """parses, formats and stores struct information, executes union parse function"""
+    _default_session.parse_structs(cursor)
+
+
+def parse_union(parent, cursor):
+    """parses and stores union information within a struct"""
+    _default_session.parse_union(parent, cursor)
+
+
+def parse_enum(cursor: Cursor) -> bool:
+    """parses and stores enum information"""
+    return _default_session.parse_enum(cursor)
+
+
+def generate_forward():
+    """generates formatted forward declarations for converted header, returns string"""
+    return _default_session.generate_forward()
 
 
 def generate_enums():
     """generates formatted enums for converted header, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Enums ------------------------------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for enum in enums:
-        string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-        string += "{} */\n".format(enum.source_location)
-        string += "\n"
-        string += "typedef enum\n"
-        string += "{\n"
-        string += ",\n".join([f'    {enumerator}' for enumerator in enum.enumerators])
-        string += "\n"
-        string += "}} {};\n".format(enum.name)
-        string += "\n"
-    string += "\n"
-    return string
+    return _default_session.generate_enums()
 
 
 def generate_variables():
     """generates formatted variables for converted header, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Variable declarations --------------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for variable in variables:
-        string += "{}\n".format(variable)
-    string += "\n\n"
-    return string
+    return _default_session.generate_variables()
 
 
 def generate_union(parent):
     """generates formatted unions within structs for converted header, returns string"""
-    string = ""
-    if parent in unions:
-        union = unions[parent]
-        string += "    union\n    {\n"
-        for member in union.members:
-            string += "        {};\n".format(member)
-        string += "    };\n"
-    return string
+    return _default_session.generate_union(parent)
 
 
 def generate_structs():
     """generates formatted structs for converted header, executes union generator function, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Structs ----------------------------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for struct in structs:
-        string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-        string += "{} */\n".format(struct.source_location)
-        string += "\n"
-        string += "struct {}\n{{\n".format(struct.name)
-        for field in struct.members:
-            string += "    {}\n".format(field)
-        string += generate_union(struct.name)
-        string += "};\n"
-        string += "\n"
-    string += "\n"
-    return string
+    return _default_session.generate_structs()
 
 
-# noinspection SpellCheckingInspection
 def generate_interface():
     """generates formatted interfaces for converted header, executes method generator function, returns string"""
-    string = ""
-    string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-    string += "----- Interfaces -------------------------------------------------------------------------------------------------------\n"
-    string += "----------------------------------------------------------------------------------------------------------------------*/\n"
-    string += "\n"
-    for interface in interfaces:
-        string += "/*----------------------------------------------------------------------------------------------------------------------\n"
-        string += "{} */\n".format(interface.source_location)
-        string += "\n"
-        string += "typedef struct {}Vtbl\n".format(interface.name)
-        string += "{\n"
-        for base_class in interface.base_classes:
-            string += "    /* methods derived from \"{}\": */\n".format(base_class.name)
-            string += "\n".join([f'    {method}' for method in base_class.methods])
-            string += "\n\n"
-        if interface.methods:
-            string += "    /* methods defined in \"{}\": */\n".format(interface.name)
-            string += "\n".join([f'    {method}' for method in interface.methods])
-            string += "\n\n"
-        string += "{} {}Vtbl;\n".format("}", interface.name)
-        string += "\n"
-        string += "typedef struct {}\n".format(interface.name)
-        string += "{\n"
-        string += "    struct {}Vtbl* lpVtbl;\n".format(interface.name)
-        string += "{} {};\n".format("}", interface.name)
-        if interface.iid:
-            string += "\n"
-            string += "{}\n".format(interface.iid)
-        string += "\n"
-    return string
+    return _default_session.generate_interface()
 
 
 def generate_conversion():
     """executes individual generator functions, returns finalised string"""
-    string = generate_standard()
-    string += generate_typedefs(typedefs, 'Typedefs')
-    string += generate_forward()
-    string += generate_return_types()
-    string += generate_typedefs(interface_typedefs, 'Interface typedefs')
-    string += generate_enums()
-    string += generate_variables()
-    string += generate_structs()
-    string += generate_interface()
-    return string
+    return _default_session.generate_conversion()
 
 
 def print_info():
     """prints information about header file, not necessary for generator process"""
-    print("Number of enums: {}".format(len(enums)))
-    for enum in enums:
-        print(" {}".format(enum.name))
-    print()
-    print("Number of structs: {}".format(len(structs)))
-    for struct in structs:
-        print(" {}".format(struct.name))
-    print()
-    print("Number of interfaces: {}".format(len(interfaces)))
-    print()
-    for index, interface in enumerate(interfaces):
-        print("Interface {}: {}".format(index + 1, interface.name))
-        print(interface.source_location)
-        print("Info:", interface.description)
-        print("Methods:")
-        for method in interface.methods:
-            match = re.search('SMTG_STDMETHODCALLTYPE\\*\\s+([^)]+)', method)
-            if match:
-                print(" {}".format(match.group(1)))
-        print()
-    print()
-
-
-# ----- Arrays ---------------------------------------------------------------------------------------------------------
-
-"""defines all used storage structures"""
-interfaces = Container()
-unions = Container()
-structs = Container()
-enums = Container()
-typedefs = Container()
-interface_typedefs = Container()
-variables = Container()
-
-blocklist = ["FUID", "FReleaser"]
-
-
-def clear_arrays():
-    """clears all used storage structures"""
-    global interfaces
-    global unions
-    global structs
-    global enums
-    global typedefs
-    global interface_typedefs
-    global variables
-
-    interfaces.clear()
-    unions.clear()
-    structs.clear()
-    enums.clear()
-    typedefs.clear()
-    interface_typedefs.clear()
-    variables.clear()
+    _default_session.print_info()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -793,35 +1342,201 @@ def clear_arrays():
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-if __name__ == '__main__':
-
+def main():
     """lets users define the output type"""
     print_header = True
     write_header = True
 
     """establishes translation unit"""
-    parser = ArgumentParser(description='usage: {filename} [clang-args*]')
-    parser.add_argument('filename', type=str)
+    parser = ArgumentParser(description='usage: {filename} [clang-args*], filename is either a header compilation or '
+                                        'a pluginterfaces directory, which is converted without writing to it')
+    parser.add_argument('filename', type=str, nargs='?')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='parses the includes of the header in this many worker processes')
+    parser.add_argument('--group-size', type=int, default=1, help='number of includes parsed by one worker task')
+    parser.add_argument('--cache-dir', type=str, help='directory of the persistent parse cache')
+    parser.add_argument('--dump-ir', type=str, help='writes the parsed model to this IR file')
+    parser.add_argument('--from-ir', type=str, help='generates the header from this IR file instead of parsing')
+    parser.add_argument('--parse-profile', choices=sorted(parse_profiles), default='default',
+                        help='named set of libclang parse options')
+    parser.add_argument('--enum-values', choices=enum_modes, default='expression',
+                        help='writes enumerator initializers as in the source or as values computed by libclang')
+    parser.add_argument('--variants', type=str,
+                        help='comma-separated output variants rendered from one parse, any of {}'.format(
+                            ', '.join(output_variants)))
+    parser.add_argument('--split', type=str,
+                        help='writes one header per source header and an umbrella header into this directory, '
+                             'using the first of the given variants')
+    parser.add_argument('--only', type=str,
+                        help='comma-separated interfaces or other elements, e.g. IComponent,IAudioProcessor, '
+                             'only these and everything they depend on are generated')
+    parser.add_argument('--output-cache', type=str,
+                        help='directory of the output cache, which restores the generated headers without parsing '
+                             'if the included headers, clang arguments, options and generator are unchanged')
+    parser.add_argument('--precompile', type=str,
+                        help='comma-separated stable base includes, e.g. pluginterfaces/base/funknown.h, '
+                             'which are precompiled once and shared by all translation units')
+    parser.add_argument('--pch', type=str,
+                        help='path of the precompiled header, reused if --precompile is omitted, defaults to a file '
+                             'in the temporary directory named after the includes, clang arguments and libclang')
+    parser.add_argument('--watch', action='store_true',
+                        help='keeps the translation unit alive and regenerates the header whenever a watched file '
+                             'changes')
+    parser.add_argument('--watch-interval', type=float, default=0.2, help='polling interval of the watch mode')
+    parser.add_argument('--profile', type=str,
+                        help='writes wall and CPU time per phase, cursor and libclang call counts and the slowest '
+                             'declarations as JSON to this file, disables the output cache')
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help='number of slowest declarations in the profile')
     parser.add_argument('clang_args', nargs=REMAINDER)
     args = parser.parse_args()
+    if args.watch:
+        # the watch mode parses the header itself and always writes the single default header
+        watch_conflicts = [option for option, value in [('--from-ir', args.from_ir), ('--dump-ir', args.dump_ir),
+                                                         ('--jobs', args.jobs), ('--cache-dir', args.cache_dir),
+                                                         ('--variants', args.variants), ('--split', args.split),
+                                                         ('--only', args.only), ('--output-cache', args.output_cache),
+                                                         ('--profile', args.profile)] if value]
+        if watch_conflicts:
+            parser.error('--watch cannot be combined with {}'.format(', '.join(watch_conflicts)))
     filename = args.filename
-    if not filename:
+    profiler = ConversionProfiler(args.profile_top)
+    if not filename and not args.from_ir:
         print('No filename was specified!')
         exit(1)
-    include_path = normalise_link(str(Path(sys.argv[1]).parents[2]))
-    tu = create_translation_unit(Path(filename), include_path, args.clang_args)
+    header_path = Path(filename) if filename else None
+    header_content = None
+    if header_path and header_path.is_dir():
+        if args.watch:
+            print('The watch mode requires a header compilation!')
+            exit(1)
+        with profiler.phase('render_header_compilation'):
+            header_content = render_header_compilation(header_path)
+        header_path = get_header_compilation_path(header_path)
+    variants = [default_variant]
+    if args.variants:
+        unknown_variants = [name for name in args.variants.split(',') if name not in output_variants]
+        if unknown_variants:
+            print('Unknown variants: {}'.format(', '.join(unknown_variants)))
+            exit(1)
+        variants = [output_variants[name] for name in args.variants.split(',')]
+
+    """restores the generated headers from the output cache"""
+    output_directory = Path(args.split or '.')
+    output_cache = None
+    dependencies = {}
+    if args.output_cache and header_path and not args.from_ir and not args.dump_ir and not args.profile:
+        if args.precompile or args.pch:
+            # the includes of a precompiled header are not reported by the translation unit, so can't be hashed
+            print('Output cache: skipped, a precompiled header is used', file=sys.stderr)
+        else:
+            output_cache = OutputCache(Path(args.output_cache))
+            cache_key = output_cache.get_key(header_content or header_path.read_text(), args.clang_args,
+                                             [args.enum_values, args.parse_profile, args.variants, args.only,
+                                              bool(args.split)])
+            output_paths = output_cache.restore(cache_key, output_directory, sys.stdout)
+            if output_paths is not None:
+                print('Output cache: restored {} files'.format(len(output_paths)), file=sys.stderr)
+                return
 
     """executes parsing and generator function"""
-    parse_header(tu.cursor)
-    header_content = generate_conversion()
+    clang_args = args.clang_args
+    if header_path and (args.precompile or args.pch):
+        include_path = normalise_link(str(header_path.parents[2]))
+        if args.pch:
+            pch_path = Path(args.pch).absolute()
+        else:
+            pch_path = get_precompiled_header_path(Path(tempfile.gettempdir()), args.precompile.split(','),
+                                                   include_path, clang_args)
+        if args.precompile:
+            with profiler.phase('precompile'):
+                create_precompiled_header(pch_path, args.precompile.split(','), include_path, clang_args)
+        clang_args = clang_args + ['-include-pch', str(pch_path)]
+    if args.watch:
+        # imported here as the watch mode itself depends on this module
+        from watch_convert import HeaderWatcher
+        include_path = normalise_link(str(header_path.parents[2]))
+        watcher = HeaderWatcher(header_path, include_path, clang_args, args.parse_profile,
+                                enum_mode=args.enum_values)
+        try:
+            watcher.run(Path("vst3_c_api.h"), args.watch_interval)
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.from_ir:
+        session = ConversionSession()
+        with open(args.from_ir) as ir_file, profiler.phase('load_ir'):
+            load_ir(session, ir_file)
+    elif args.jobs or args.cache_dir:
+        include_path = normalise_link(str(header_path.parents[2]))
+        # imported here as the parallel conversion itself depends on this module
+        from parallel_convert import parse_header_parallel
+        from parse_cache import ParseCache
+        cache = ParseCache(Path(args.cache_dir)) if args.cache_dir else None
+        with profiler.phase('parse_header_parallel'):
+            session = parse_header_parallel(header_path, include_path, clang_args, args.jobs or 1,
+                                            args.group_size, ConversionSession(enum_mode=args.enum_values), cache,
+                                            args.parse_profile, header_content, dependencies)
+        if cache:
+            print(cache.report(), file=sys.stderr)
+    else:
+        include_path = normalise_link(str(header_path.parents[2]))
+        # a rendered header compilation is handed to libclang in memory, just like convert() does
+        unsaved_files = [(str(header_path), header_content)] if header_content else None
+        with profiler.phase('create_translation_unit'):
+            tu = create_translation_unit(header_path, include_path, clang_args, unsaved_files=unsaved_files,
+                                         profile=args.parse_profile)
+        session = ConversionSession(enum_mode=args.enum_values)
+        with profiler.phase('parse_header'), profiler.instrument(session) if args.profile else nullcontext():
+            session.parse_header(tu.cursor)
+        if output_cache:
+            dependencies.update(hash_dependencies(sorted({inclusion.include.name
+                                                          for inclusion in tu.get_includes()})))
+    if args.dump_ir:
+        with open(args.dump_ir, 'w') as ir_file, profiler.phase('dump_ir'):
+            dump_ir(session, ir_file)
+    if args.only:
+        # imported here as the subset conversion itself depends on this module
+        from subset_convert import create_subset
+        try:
+            with profiler.phase('create_subset'):
+                session = create_subset(session, args.only.split(','))
+        except ValueError as error:
+            print(error)
+            exit(1)
+    with profiler.phase('finalize'):
+        warnings = session.finalize()
+    print_warnings(warnings)
 
     """outputs generated header as new header file"""
     if write_header:
-        header_path = "vst3_c_api.h"
-        with open(header_path, 'w') as h:
-            h.write(header_content)
+        with profiler.phase('write_conversion'):
+            if args.split:
+                # imported here as the split conversion itself depends on this module
+                from split_convert import write_split
+                output_paths = write_split(session, output_directory, variants[0])
+            else:
+                output_paths = session.write_variants(variants, output_directory)
 
     """outputs generated header in console"""
+    # the console output is collected for the output cache, which prints it again on a restore
+    console = StringIO() if output_cache else sys.stdout
     if print_header:
-        print(header_content)
-        print_info()
+        with profiler.phase('print_conversion'):
+            session.write_conversion(console, variants[0])
+            print(file=console)
+        with redirect_stdout(console):
+            session.print_info()
+    if output_cache:
+        sys.stdout.write(console.getvalue())
+        if write_header:
+            output_cache.store(cache_key, output_directory, output_paths, dependencies, console.getvalue())
+
+    """outputs the profile of the conversion"""
+    if args.profile:
+        with open(args.profile, 'w') as profile_file:
+            profiler.write_report(profile_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Serializable intermediate representation of a parsed conversion session.
+
+The parsed model is stored as a list of file records, one for each source file in the order it was parsed.
+Each record holds the name of the source file relative to the include root and, for every storage structure
+of the session, the elements parsed from that file as plain dictionaries. Records only contain builtin types,
+so they can be passed between processes or written to disk and loaded into a new session later on.
+
+IR files are JSON documents of the following form, all strings are already converted to their C spelling:
+
+{
+    "format": "vst3_c_api_ir",
+    "version": 2,
+    "files": [
+        {
+            "file": "pluginterfaces/base/funknown.h",
+            "interfaces": [{"name", "source_location", "description", "base_classes": [names of direct bases],
+                            "methods": [{"name", "return_type", "parameters": [{"type", "name"}], "const"}],
+                            "iid": IID definition or null}],
+            "unions": [{"name": name of the enclosing struct, "members": [member declarations]}],
+            "structs": [{"name", "source_location", "members": [field declarations]}],
+            "enums": [{"name", "source_location", "enumerators": [enumerators with optional initializer]}],
+            "typedefs": [{"name", "return_type"}],
+            "interface_typedefs": [{"name", "return_type"}],
+            "variables": [{"name", "value_type", "value"}]
+        }
+    ]
+}
+
+Base classes are resolved by name when loading, so a file record may only refer to interfaces of itself or of
+preceding records. The version is increased with every incompatible change of the format.
+"""
+
+import json
+from typing import List, Iterable, TextIO
+
+from data_classes import Enum, Interface, Struct, Variable, Union, Typedef
+
+ir_format = 'vst3_c_api_ir'
+ir_version = 2
+storage_names = ('interfaces', 'unions', 'structs', 'enums', 'typedefs', 'interface_typedefs', 'variables')
+
+_storage_classes = {
+    'unions': Union,
+    'structs': Struct,
+    'enums': Enum,
+    'typedefs': Typedef,
+    'interface_typedefs': Typedef,
+    'variables': Variable
+}
+
+
+def dump_file_records(session) -> List[dict]:
+    """splits the storage structures of a session into one record per parsed source file"""
+    records = []
+    for source_file, start_sizes, end_sizes in session.file_ranges:
+        record = {'file': source_file}
+        for name in storage_names:
+            elements = getattr(session, name)[start_sizes[name]:end_sizes[name]]
+            record[name] = [element.to_dict() for element in elements]
+        records.append(record)
+    return records
+
+
+def merge_file_records(record_lists: Iterable[List[dict]]) -> List[dict]:
+    """concatenates lists of file records, keeping only the first record of every source file"""
+    result = []
+    merged_files = set()
+    for records in record_lists:
+        for record in records:
+            if record['file'] in merged_files:
+                continue
+            merged_files.add(record['file'])
+            result.append(record)
+    return result
+
+
+def load_file_records(session, records: List[dict]):
+    """appends the elements of the given file records to the storage structures of a session"""
+    for record in records:
+        start_sizes = session.get_storage_sizes()
+        for name in storage_names:
+            container = getattr(session, name)
+            for data in record[name]:
+                if name == 'interfaces':
+                    container.append(Interface.from_dict(data, container))
+                else:
+                    container.append(_storage_classes[name].from_dict(data))
+        session.file_ranges.append((record['file'], start_sizes, session.get_storage_sizes()))
+
+
+def dump_ir(session, ir_file: TextIO):
+    """writes the parsed model of a session as IR file"""
+    json.dump({'format': ir_format, 'version': ir_version, 'files': dump_file_records(session)}, ir_file, indent=1)
+    ir_file.write('\n')
+
+
+def load_ir(session, ir_file: TextIO):
+    """loads an IR file into the storage structures of a session"""
+    data = json.load(ir_file)
+    if data.get('format') != ir_format or data.get('version') != ir_version:
+        raise ValueError('Unsupported IR format: {} version {}'.format(data.get('format'), data.get('version')))
+    load_file_records(session, data['files'])
@@ -0,0 +1,121 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Write-if-changed output and a content-addressed cache of generated headers.
+
+Generated files are first written next to their destination and only moved into place if their content differs,
+so unchanged headers keep their modification time and don't invalidate any downstream object file. A sidecar file
+holding the sha256 of the content, in the format of sha256sum, is written next to each header.
+
+The output cache stores all files of a conversion under a key made of the content of the header compilation, the
+clang arguments, the output options and the generator version. Just like the parse cache, an entry holds the content
+hash of every file the conversion included, and is only restored as long as all of these files are unchanged. On a
+hit the files are restored without parsing anything.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, TextIO
+
+from parse_cache import hash_file, hash_dependencies, get_generator_version
+
+
+def get_sidecar_path(output_path: Path) -> Path:
+    """returns the path of the content hash sidecar of an output file"""
+    return output_path.with_name(output_path.name + '.sha256')
+
+
+def _write_sidecar(output_path: Path, content_hash: str):
+    sidecar_content = '{}  {}\n'.format(content_hash, output_path.name)
+    sidecar_path = get_sidecar_path(output_path)
+    try:
+        if sidecar_path.read_text() == sidecar_content:
+            return
+    except OSError:
+        pass
+    sidecar_path.write_text(sidecar_content)
+
+
+def write_if_changed(output_path: Path, write_function: Callable[[TextIO], None], sidecar: bool = True) -> bool:
+    """
+    streams the output of write_function into a temporary file and replaces the output file only if their contents
+    differ, returns whether the output file was written
+    """
+    output_path = Path(output_path)
+    temporary_path = output_path.with_name('.{}.{}.tmp'.format(output_path.name, os.getpid()))
+    with temporary_path.open('w') as temporary_file:
+        write_function(temporary_file)
+    content_hash = hash_file(str(temporary_path))
+    changed = content_hash != hash_file(str(output_path))
+    if changed:
+        os.replace(temporary_path, output_path)
+    else:
+        temporary_path.unlink()
+    if sidecar:
+        _write_sidecar(output_path, content_hash)
+    return changed
+
+
+class OutputCache:
+    def __init__(self, cache_path: Path):
+        self._cache_path = Path(cache_path)
+        self._generator_version = get_generator_version()
+
+    def get_key(self, header_content: str, clang_args: List[str], options: List[str]) -> str:
+        """
+        returns the cache key of a conversion, header_content is the content of the header compilation,
+        options are all command line options affecting the output
+        """
+        key = json.dumps([hashlib.sha256(header_content.encode()).hexdigest(), clang_args or [],
+                          options, self._generator_version])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self._cache_path / '{}.json'.format(key)
+
+    def restore(self, key: str, output_directory: Path, console: TextIO = None) -> Optional[List[Path]]:
+        """
+        writes the cached files of a key into output_directory and the cached console output into console,
+        returns the files or None if the key is missing or any file the conversion included changed
+        """
+        try:
+            with self._get_entry_path(key).open() as entry_file:
+                entry = json.load(entry_file)
+            files, console_output, dependencies = entry['files'], entry['console'], entry['dependencies']
+            if hash_dependencies(list(dependencies)) != dependencies:
+                return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        output_paths = []
+        for name, content in files.items():
+            output_path = Path(output_directory) / name
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(output_path, lambda writer: writer.write(content))
+            output_paths.append(output_path)
+        if console:
+            console.write(console_output)
+        return output_paths
+
+    def store(self, key: str, output_directory: Path, output_paths: List[Path], dependencies: Dict[str, str],
+              console_output: str = ''):
+        """
+        stores the given output files, their names are kept relative to output_directory, together with the content
+        hashes of all files the conversion included and its console output, which a restore prints again
+        """
+        files: Dict[str, str] = {}
+        for output_path in output_paths:
+            files[Path(output_path).relative_to(output_directory).as_posix()] = Path(output_path).read_text()
+        self._cache_path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._get_entry_path(key)
+        temporary_path = entry_path.with_name('{}.{}.tmp'.format(entry_path.name, os.getpid()))
+        with temporary_path.open('w') as entry_file:
+            json.dump({'files': files, 'console': console_output, 'dependencies': dependencies}, entry_file)
+        os.replace(temporary_path, entry_path)
@@ -0,0 +1,98 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Parallel conversion of a header compilation.
+
+Instead of parsing the whole header compilation as one translation unit, its includes are split into groups
+which are parsed in separate worker processes. Every worker returns the file records of its translation unit,
+the records are merged in include order and loaded into a single session. As every pluginterfaces header is
+include-guarded, the merged model is identical to the one of the serial conversion. The same grouping is used
+by the persistent parse cache, which only re-parses the groups whose included files changed.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple, Dict
+
+from clang_helpers import create_translation_unit
+from interface_convert import ConversionSession, normalise_link
+from intermediate_representation import dump_file_records, merge_file_records, load_file_records
+from parse_cache import ParseCache, hash_dependencies
+
+
+def read_includes(header_path: Path, header_content: str = None) -> List[str]:
+    """returns the quoted includes of a header compilation in order, header_content replaces the file if given"""
+    if header_content is None:
+        with header_path.open() as header_file:
+            header_content = header_file.read()
+    return re.findall(r'^\s*#\s*include\s+"([^"]+)"', header_content, flags=re.MULTILINE)
+
+
+def _create_group_source(includes: List[str]) -> str:
+    return ''.join('#include "{}"\n'.format(include) for include in includes)
+
+
+def _parse_group(group_path: str, includes: List[str], include_path: str, clang_args: List[str],
+                 blocklist: List[str], enum_mode: str, profile: str) -> Tuple[List[dict], Dict[str, str]]:
+    """parses a group of includes and returns its file records and the content hashes of all included files"""
+    translation_unit = create_translation_unit(Path(group_path), include_path, clang_args,
+                                               unsaved_files=[(group_path, _create_group_source(includes))],
+                                               profile=profile)
+    session = ConversionSession(blocklist, enum_mode)
+    session.parse_header(translation_unit.cursor)
+    dependencies = sorted({inclusion.include.name for inclusion in translation_unit.get_includes()})
+    return dump_file_records(session), hash_dependencies(dependencies)
+
+
+def parse_header_parallel(header_path: Path, include_path: str, clang_args: List[str] = None, jobs: int = None,
+                          group_size: int = 1, session: ConversionSession = None,
+                          cache: ParseCache = None, profile: str = 'default',
+                          header_content: str = None, dependencies: Dict[str, str] = None) -> ConversionSession:
+    """
+    parses the includes of a header compilation in groups of group_size headers using up to jobs worker processes,
+    the groups are written as in-memory headers next to the header compilation so that relative includes still apply,
+    groups found in the given cache are not parsed again, header_content replaces the header compilation file,
+    which then doesn't need to exist, the content hashes of all included files are added to dependencies if given
+    """
+    if session is None:
+        session = ConversionSession()
+    includes = read_includes(header_path, header_content)
+    include_directories = [normalise_link(str(header_path.parent)), include_path]
+    groups = [includes[index:index + group_size] for index in range(0, len(includes), group_size)]
+    # the parse profile and enum mode are part of the cache key just like the clang arguments
+    cache_args = list(clang_args or []) + [f'--parse-profile={profile}', f'--enum-values={session.enum_mode}']
+    record_lists = [None] * len(groups)
+    if dependencies is None:
+        dependencies = {}
+    if cache:
+        for index, group in enumerate(groups):
+            entry = cache.load(group, include_directories, cache_args, session.blocklist)
+            if entry:
+                record_lists[index] = entry[0]
+                dependencies.update(entry[1])
+    missing_indices = [index for index, records in enumerate(record_lists) if records is None]
+    group_paths = [str(header_path.with_name(f'{header_path.stem}_group{index}{header_path.suffix}'))
+                   for index in missing_indices]
+    arguments = [group_paths, [groups[index] for index in missing_indices], [include_path] * len(missing_indices),
+                 [clang_args] * len(missing_indices), [session.blocklist] * len(missing_indices),
+                 [session.enum_mode] * len(missing_indices), [profile] * len(missing_indices)]
+    if jobs == 1 or len(missing_indices) < 2:
+        results = list(map(_parse_group, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_parse_group, *arguments))
+    for index, (records, group_dependencies) in zip(missing_indices, results):
+        record_lists[index] = records
+        dependencies.update(group_dependencies)
+        if cache:
+            cache.store(groups[index], include_directories, cache_args, session.blocklist, records,
+                        group_dependencies)
+    load_file_records(session, merge_file_records(record_lists))
+    return session
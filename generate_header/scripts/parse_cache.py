@@ -0,0 +1,114 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Persistent cache of parsed file records.
+
+Every group of includes of a header compilation is stored as one cache entry, named after a hash of the include
+group, the include directories, the clang arguments, the blocklist and the generator version. An entry holds the
+file records of the group together with the content hash of every file its translation unit included, and is
+only reused as long as all of these files are unchanged. Thus a rebuild re-parses just the groups depending on
+a modified header.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+from intermediate_representation import ir_version, storage_names
+
+_generator_sources = ['clang_helpers.py', 'data_classes.py', 'interface_convert.py', 'intermediate_representation.py',
+                      'output_cache.py', 'parallel_convert.py', 'parse_cache.py', 'profile_convert.py',
+                      'split_convert.py', 'subset_convert.py']
+
+
+def hash_file(file_path: str) -> Optional[str]:
+    """returns the sha256 of a file's content or None if it can't be read"""
+    try:
+        with open(file_path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def get_generator_version() -> str:
+    """returns a hash of the generator sources, so that any change of the generator invalidates the cache"""
+    source_directory = Path(__file__).parent
+    return hashlib.sha256(''.join(hash_file(str(source_directory / name)) or '' for name in _generator_sources)
+                          .encode()).hexdigest()
+
+
+def hash_dependencies(dependencies: List[str]) -> Dict[str, str]:
+    """returns the content hashes of the given files"""
+    return {dependency: hash_file(dependency) for dependency in dependencies}
+
+
+class ParseCache:
+    def __init__(self, cache_path: Path):
+        self._cache_path = Path(cache_path)
+        self._generator_version = get_generator_version()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_entry_path(self, includes: List[str], include_directories: List[str], clang_args: List[str],
+                        blocklist: List[str]) -> Path:
+        key = json.dumps([includes, include_directories, clang_args or [], blocklist, self._generator_version])
+        return self._cache_path / '{}.json'.format(hashlib.sha256(key.encode()).hexdigest())
+
+    def load(self, includes: List[str], include_directories: List[str], clang_args: List[str],
+             blocklist: List[str]) -> Optional[Tuple[List[dict], Dict[str, str]]]:
+        """
+        returns the cached file records of an include group and the content hashes of its dependencies
+        or None if they are missing or outdated
+        """
+        entry_path = self._get_entry_path(includes, include_directories, clang_args, blocklist)
+        try:
+            with entry_path.open() as entry_file:
+                entry = self._read_entry(json.load(entry_file))
+        except (OSError, ValueError, KeyError, TypeError):
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    @staticmethod
+    def _read_entry(entry: dict) -> Optional[Tuple[List[dict], Dict[str, str]]]:
+        """
+        returns the file records and dependencies of an entry or None if its dependencies changed,
+        raises KeyError, ValueError or TypeError if the entry is malformed or written by another IR version
+        """
+        if entry['version'] != ir_version:
+            raise ValueError('Unsupported IR version: {}'.format(entry['version']))
+        records = entry['records']
+        for record in records:
+            for name in ('file',) + storage_names:
+                if name not in record:
+                    raise KeyError(name)
+        if hash_dependencies(list(entry['dependencies'])) != entry['dependencies']:
+            return None
+        return records, entry['dependencies']
+
+    def store(self, includes: List[str], include_directories: List[str], clang_args: List[str],
+              blocklist: List[str], records: List[dict], dependencies: Dict[str, str]):
+        """writes the file records of an include group together with the content hashes of its dependencies"""
+        entry_path = self._get_entry_path(includes, include_directories, clang_args, blocklist)
+        self._cache_path.mkdir(parents=True, exist_ok=True)
+        temporary_path = entry_path.with_name('{}.{}.tmp'.format(entry_path.name, os.getpid()))
+        with temporary_path.open('w') as entry_file:
+            json.dump({'version': ir_version, 'dependencies': dependencies, 'records': records}, entry_file)
+        os.replace(temporary_path, entry_path)
+
+    def report(self) -> str:
+        """returns a summary of cache hits and misses"""
+        total = self.hits + self.misses
+        return 'Parse cache: {} hits, {} misses ({:.0%} hit rate)'.format(self.hits, self.misses,
+                                                                        self.hits / total if total else 0)
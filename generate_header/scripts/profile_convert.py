@@ -0,0 +1,136 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Per phase profiling of a conversion.
+
+The profiler measures wall and CPU time of every phase of a conversion. While a session parses a translation unit,
+it also counts the handled cursors per cursor kind, the get_children, get_definition and get_tokens calls made to
+libclang, and the time spent in every declaration handler. The slowest declarations are reported by name and
+location. The report is a JSON object, so it can be compared between SDK versions.
+
+The CPU time only covers the current process; the workers of the parallel conversion are not included. Cursors
+are only counted when the session parses in the current process.
+"""
+
+import heapq
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Tuple, Callable, TextIO
+
+from clang.cindex import Cursor, CursorKind
+# noinspection PyProtectedMember
+from clang.cindex import TokenGroup as TGroup
+
+
+class ConversionProfiler:
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.phases = {}
+        self.cursor_kinds = Counter()
+        self.libclang_calls = Counter()
+        self._declarations: List[Tuple[float, int, str, Cursor, str]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """measures wall and CPU time of the enclosed code, repeated phases are added up"""
+        start_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            phase = self.phases.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            phase['wall_seconds'] += time.perf_counter() - start_time
+            phase['cpu_seconds'] += time.process_time() - start_cpu_time
+
+    def _wrap_handler(self, kind: CursorKind, handler: Callable, timed: bool) -> Callable:
+        cursor_kinds = self.cursor_kinds
+        declarations = self._declarations
+
+        def counting_handler(cursor, *args):
+            cursor_kinds[kind.name] += 1
+            if not timed:
+                return handler(cursor, *args)
+            start_time = time.perf_counter()
+            try:
+                return handler(cursor, *args)
+            finally:
+                declarations.append((time.perf_counter() - start_time, len(declarations), kind.name, cursor,
+                                     args[0] if args else ''))
+
+        return counting_handler
+
+    def _wrap_library_function(self, name: str, function: Callable) -> Callable:
+        libclang_calls = self.libclang_calls
+
+        def counting_function(*args):
+            libclang_calls[name] += 1
+            return function(*args)
+
+        return counting_function
+
+    @contextmanager
+    def instrument(self, session):
+        """
+        counts the cursors handled by the session and its libclang calls, the dispatch tables of the session are
+        wrapped on the instance, the counted libclang functions are patched for the enclosed code only
+        """
+        # noinspection PyProtectedMember
+        declaration_handlers, interface_member_handlers = session._declaration_handlers, \
+            session._interface_member_handlers
+        session._declaration_handlers = {kind: self._wrap_handler(kind, handler, True)
+                                         for kind, handler in declaration_handlers.items()}
+        session._interface_member_handlers = {kind: self._wrap_handler(kind, handler, False)
+                                              for kind, handler in interface_member_handlers.items()}
+        # namespaces are dispatched without a handler table
+        session._parse_namespace_children = self._wrap_handler(CursorKind.NAMESPACE,
+                                                               session._parse_namespace_children, False)
+        # Cursor.get_tokens and the token cache both tokenize through TokenGroup.get_tokens
+        patched_functions = [(Cursor, 'get_children'), (Cursor, 'get_definition'), (TGroup, 'get_tokens')]
+        original_functions = [owner.__dict__[name] for owner, name in patched_functions]
+        for (owner, name), function in zip(patched_functions, original_functions):
+            wrapped_function = self._wrap_library_function(name, getattr(owner, name))
+            setattr(owner, name, staticmethod(wrapped_function) if isinstance(function, staticmethod) else
+                    wrapped_function)
+        try:
+            yield
+        finally:
+            for (owner, name), function in zip(patched_functions, original_functions):
+                setattr(owner, name, function)
+            del session._parse_namespace_children
+            session._declaration_handlers = declaration_handlers
+            session._interface_member_handlers = interface_member_handlers
+
+    def get_slowest_declarations(self) -> List[dict]:
+        """returns the top slowest declaration handler calls, nested declarations are part of their parent's time"""
+        slowest_declarations = []
+        for seconds, _, kind, cursor, namespace in heapq.nlargest(self.top, self._declarations):
+            location = cursor.location
+            slowest_declarations.append({
+                'name': '{}::{}'.format(namespace, cursor.spelling) if namespace else cursor.spelling,
+                'kind': kind,
+                'location': '{}:{}'.format(location.file.name if location.file else '', location.line),
+                'seconds': seconds
+            })
+        return slowest_declarations
+
+    def report(self) -> dict:
+        """returns the collected measurements"""
+        return {
+            'phases': self.phases,
+            'cursor_kinds': dict(self.cursor_kinds.most_common()),
+            'libclang_calls': {name: self.libclang_calls[name] for name in ['get_children', 'get_definition',
+                                                                            'get_tokens']},
+            'slowest_declarations': self.get_slowest_declarations()
+        }
+
+    def write_report(self, writer: TextIO):
+        json.dump(self.report(), writer, indent=2)
+        writer.write('\n')
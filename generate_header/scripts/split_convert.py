@@ -0,0 +1,174 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Split conversion into one C header per source header.
+
+Every file record of the parsed model is written as its own header, e.g. pluginterfaces/vst/ivstaudioprocessor.h
+as vst/ivstaudioprocessor_c.h, next to a base header holding the standard definitions and an umbrella header
+including all of them. The includes of a header are derived from the spellings of its elements: a header includes
+every header declaring an element it refers to, except for structs and interfaces which are only referred to by
+pointer, these are forward declared instead. The result value definitions are written into the header which
+declares the typedefs they refer to, which is funknown.h for the SDK.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import List, Dict, Iterable
+
+from data_classes import Container
+from interface_convert import ConversionSession, OutputVariant, default_variant, license_lines, iter_banner, \
+    iter_standard, iter_typedefs, iter_return_types, generate_return_types
+from intermediate_representation import dump_file_records, storage_names
+from output_cache import write_if_changed
+from subset_convert import create_name_index, find_references, iter_spellings
+
+_pointer_pattern = re.compile(r'struct\s+(\w+)\s*\*')
+
+
+def get_split_header_name(source_file: str) -> str:
+    """returns the name of the split header of a source file relative to the output directory"""
+    source_path = Path(source_file)
+    parts = source_path.parts[1:-1] if len(source_path.parts) > 1 else ()
+    return Path(*parts, source_path.stem + '_c.h').as_posix()
+
+
+def _get_include_guard(header_name: str) -> str:
+    return 'VST3_C_API_' + re.sub(r'\W', '_', header_name).upper()
+
+
+def _get_include(header_name: str, included_header_name: str) -> str:
+    """returns the include path of a header relative to the including header, so no include path is required"""
+    return Path(os.path.relpath(included_header_name, Path(header_name).parent.as_posix())).as_posix()
+
+
+def _create_part(session: ConversionSession, start_sizes: Dict[str, int],
+                 end_sizes: Dict[str, int]) -> ConversionSession:
+    """returns a session holding the elements of one file record, the interfaces keep their base classes"""
+    part = ConversionSession(session.blocklist, session.enum_mode)
+    for name in storage_names:
+        setattr(part, name, Container(getattr(session, name)[start_sizes[name]:end_sizes[name]]))
+    return part
+
+
+class _SplitHeader:
+    def __init__(self, name: str, source_file: str, part: ConversionSession):
+        self.name = name
+        self.source_file = source_file
+        self.part = part
+        self.includes = []
+        self.forward_declarations = []
+        self.result_values = False
+
+
+def _resolve_references(headers: List[_SplitHeader], records: List[dict]):
+    """collects the includes and forward declarations of every header from the spellings of its elements"""
+    name_index = create_name_index(records)
+    element_headers = {}
+    for header, record in zip(headers, records):
+        for name in storage_names:
+            for data in record[name]:
+                element_headers.setdefault((name, data['name']), header)
+    for header, record in zip(headers, records):
+        spellings = [spelling for name in storage_names for data in record[name] for spelling in iter_spellings(data)]
+        pointer_spellings = [match for spelling in spellings for match in _pointer_pattern.findall(spelling)]
+        full_references = find_references([_pointer_pattern.sub('', spelling) for spelling in spellings], name_index)
+        included_headers = {element_headers[key] for key in full_references} - {header}
+        header.includes = [included_header for included_header in headers if included_header in included_headers]
+        for key in sorted(find_references(pointer_spellings, name_index) - full_references):
+            if element_headers[key] is not header and element_headers[key] not in included_headers:
+                header.forward_declarations.append(key[1])
+    # the result value definitions go into the last header declaring a typedef they refer to
+    result_headers = {element_headers[key] for key in find_references([generate_return_types()], name_index)}
+    for header in reversed(headers):
+        if header in result_headers:
+            header.result_values = True
+            break
+
+
+def _iter_split_header(header: _SplitHeader, base_name: str, variant: OutputVariant):
+    part = header.part
+    guard = _get_include_guard(header.name)
+    yield from license_lines
+    yield "\n"
+    yield "/* This file is the autogenerated C API of \"{}\" */\n".format(header.source_file)
+    yield "\n"
+    yield "#ifndef {}\n".format(guard)
+    yield "#define {}\n".format(guard)
+    yield "\n"
+    yield "#include \"{}\"\n".format(_get_include(header.name, base_name))
+    for included_header in header.includes:
+        yield "#include \"{}\"\n".format(_get_include(header.name, included_header.name))
+    yield "\n"
+    if part.typedefs:
+        yield from iter_typedefs(part.typedefs, 'Typedefs', variant)
+    forward_declarations = [element.name for element in part.interfaces + part.structs]
+    forward_declarations.extend(header.forward_declarations)
+    if forward_declarations:
+        yield from iter_banner('Forward declarations', variant)
+        for forward_declaration in forward_declarations:
+            yield "struct {};\n".format(forward_declaration)
+        yield "\n\n"
+    if header.result_values:
+        yield from iter_return_types(variant)
+    if part.interface_typedefs:
+        yield from iter_typedefs(part.interface_typedefs, 'Interface typedefs', variant)
+    if part.enums:
+        yield from part.iter_enums(variant)
+    if part.variables:
+        yield from part.iter_variables(variant)
+    if part.structs:
+        yield from part.iter_structs(variant)
+    if part.interfaces:
+        yield from part.iter_interface(variant)
+    yield "#endif /* {} */\n".format(guard)
+
+
+def _iter_umbrella_header(headers: Iterable[_SplitHeader], base_name: str):
+    yield from license_lines
+    yield "\n"
+    yield "/* This file is the autogenerated C API of the VST3 SDK */\n"
+    yield "\n"
+    yield "#pragma once\n"
+    yield "\n"
+    yield "#include \"{}\"\n".format(base_name)
+    for header in headers:
+        yield "#include \"{}\"\n".format(header.name)
+
+
+def _write_header(output_path: Path, chunks: Iterable[str]):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(output_path, lambda writer: writer.writelines(chunks))
+
+
+def write_split(session: ConversionSession, output_directory: Path,
+                variant: OutputVariant = default_variant) -> List[Path]:
+    """
+    writes one header per parsed source file, a base header with the standard definitions and an umbrella header
+    named after the variant, returns the written files
+    """
+    output_directory = Path(output_directory)
+    records = dump_file_records(session)
+    headers = []
+    for source_file, start_sizes, end_sizes in session.file_ranges:
+        headers.append(_SplitHeader(get_split_header_name(source_file), source_file,
+                                    _create_part(session, start_sizes, end_sizes)))
+    _resolve_references(headers, records)
+    # files without any converted element are not written
+    written_headers = [header for header in headers if header.result_values or
+                       any(getattr(header.part, name) for name in storage_names)]
+    base_name = Path(variant.file_name).stem + '_base.h'
+    output_paths = [output_directory / base_name]
+    _write_header(output_paths[0], iter_standard(variant))
+    for header in written_headers:
+        output_paths.append(output_directory / header.name)
+        _write_header(output_paths[-1], _iter_split_header(header, base_name, variant))
+    output_paths.append(output_directory / variant.file_name)
+    _write_header(output_paths[-1], _iter_umbrella_header(written_headers, base_name))
+    return output_paths
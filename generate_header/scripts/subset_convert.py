@@ -0,0 +1,144 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Tree-shaken conversion of a selected subset of the parsed model.
+
+Starting from the selected elements, the dependency closure is computed over the C spellings stored in the model:
+base classes, method return and parameter types and IIDs of interfaces, struct fields and their unions, enumerator
+initializers, typedef targets and variable types and values. Every identifier of these spellings which names an
+element of the model, or an enumerator of one of its enums, adds that element to the closure. The subset keeps the
+order of the file records it was taken from, which is already a valid declaration order.
+"""
+
+import re
+from typing import List, Dict, Tuple, Set, Iterable
+
+from interface_convert import ConversionSession, generate_standard, generate_return_types
+from intermediate_representation import dump_file_records, load_file_records, storage_names
+
+_identifier_pattern = re.compile(r'[A-Za-z_]\w*')
+# keys of element dictionaries which hold declared names or locations, but no references
+_declaration_keys = ('name', 'source_location', 'description')
+
+ElementKey = Tuple[str, str]
+
+
+def get_identifier(name: str) -> str:
+    """returns the identifier of an element name, array typedefs carry their dimension in the name"""
+    return _identifier_pattern.match(name).group()
+
+
+def iter_spellings(data) -> Iterable[str]:
+    """yields all referencing strings of an element dictionary"""
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if key not in _declaration_keys:
+                yield from iter_spellings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from iter_spellings(value)
+
+
+def create_name_index(records: List[dict]) -> Dict[str, ElementKey]:
+    """maps the name of every element and enumerator to the storage name and name of its element"""
+    name_index = {}
+    for record in records:
+        for name in storage_names:
+            if name == 'unions':
+                # unions are rendered within their struct and share its name
+                continue
+            for data in record[name]:
+                name_index.setdefault(get_identifier(data['name']), (name, data['name']))
+                if name == 'enums':
+                    for enumerator in data['enumerators']:
+                        name_index.setdefault(enumerator.split(' = ')[0], (name, data['name']))
+    return name_index
+
+
+def find_references(spellings: Iterable[str], name_index: Dict[str, ElementKey]) -> Set[ElementKey]:
+    """returns the keys of all elements whose names occur in the given spellings"""
+    return {name_index[identifier] for spelling in spellings for identifier in _identifier_pattern.findall(spelling)
+            if identifier in name_index}
+
+
+def _resolve_selection(selection: Iterable[str], name_index: Dict[str, ElementKey]) -> Set[ElementKey]:
+    """
+    resolves selected names to element keys, a name either is the full C name of an element or its last part,
+    e.g. IComponent selects Steinberg_Vst_IComponent
+    """
+    element_keys = set()
+    for selected_name in selection:
+        if selected_name in name_index:
+            element_keys.add(name_index[selected_name])
+            continue
+        candidates = sorted({element_key for name, element_key in name_index.items()
+                             if name.endswith('_' + selected_name) and get_identifier(element_key[1]) == name})
+        if not candidates:
+            raise ValueError('Unknown element: {}'.format(selected_name))
+        if len(candidates) > 1:
+            raise ValueError('Ambiguous element {}, candidates are {}'.format(
+                selected_name, ', '.join(name for _, name in candidates)))
+        element_keys.add(candidates[0])
+    return element_keys
+
+
+def _get_closure(element_keys: Set[ElementKey], records: List[dict],
+                 name_index: Dict[str, ElementKey]) -> Set[ElementKey]:
+    elements = {}
+    for record in records:
+        for name in storage_names:
+            for data in record[name]:
+                elements.setdefault((name, data['name']), []).append(data)
+    closure = set()
+    pending_keys = list(element_keys)
+    while pending_keys:
+        element_key = pending_keys.pop()
+        if element_key in closure:
+            continue
+        closure.add(element_key)
+        spellings = [spelling for data in elements.get(element_key, ()) for spelling in iter_spellings(data)]
+        if element_key[0] == 'structs':
+            spellings.extend(spelling for data in elements.get(('unions', element_key[1]), ())
+                             for spelling in iter_spellings(data))
+            closure.add(('unions', element_key[1]))
+        pending_keys.extend(find_references(spellings, name_index) - closure)
+    return closure
+
+
+def find_referenced_names(session: ConversionSession, source: str) -> List[str]:
+    """returns the names of all elements of the session which are referenced by C source code, e.g. a plugin"""
+    name_index = create_name_index(dump_file_records(session))
+    identifiers = set()
+    for identifier in _identifier_pattern.findall(source):
+        identifiers.add(identifier)
+        # vtables and IIDs are rendered for every interface, but are no elements of the model
+        identifiers.add(re.sub(r'(Vtbl|_iid)$', '', identifier))
+    return sorted({get_identifier(name_index[identifier][1]) for identifier in identifiers
+                   if identifier in name_index})
+
+
+def create_subset(session: ConversionSession, selection: Iterable[str]) -> ConversionSession:
+    """returns a new session holding the selected elements of a session and everything they depend on"""
+    records = dump_file_records(session)
+    name_index = create_name_index(records)
+    # the fixed sections of the header refer to typedefs of the model as well
+    element_keys = find_references([generate_standard(), generate_return_types()], name_index)
+    closure = _get_closure(element_keys | _resolve_selection(selection, name_index), records, name_index)
+    subset_records = []
+    for record in records:
+        subset_record = {'file': record['file']}
+        for name in storage_names:
+            subset_record[name] = [data for data in record[name] if (name, data['name']) in closure]
+        if any(subset_record[name] for name in storage_names):
+            subset_records.append(subset_record)
+    subset_session = ConversionSession(session.blocklist, session.enum_mode)
+    load_file_records(subset_session, subset_records)
+    return subset_session
@@ -0,0 +1,4 @@
+#pragma once
+
+#include "interfaces.h"
+#include "vst_interfaces.h"
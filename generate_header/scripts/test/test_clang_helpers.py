@@ -0,0 +1,123 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clang.cindex import TokenGroup
+
+from clang_helpers import create_translation_unit, create_precompiled_header, get_shared_index, get_token_cache, \
+    get_precompiled_header_path
+from interface_convert import ConversionSession
+
+
+class TestClangHelpers(unittest.TestCase):
+    def setUp(self):
+        self._directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    @staticmethod
+    def _get_header_path(header_name: str) -> Path:
+        return (Path(__file__).parent / 'headers' / f'{header_name}.h').absolute()
+
+    @staticmethod
+    def _convert(translation_unit) -> str:
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        return session.generate_conversion()
+
+    def test_shared_index(self):
+        self.assertIs(get_shared_index(), get_shared_index())
+
+    def test_precompiled_header(self):
+        header_path = self._get_header_path('interfaces')
+        include_path = str(header_path.parents[2])
+        expected_result = self._convert(create_translation_unit(header_path, include_path))
+        pch_path = create_precompiled_header(self._directory / 'base.pch',
+                                             ['test/headers/funknown.h', 'test/headers/structs.h'], include_path)
+        self.assertEqual([pch_path], list(self._directory.iterdir()))
+        for profile in ['default', 'fast', 'incomplete']:
+            translation_unit = create_translation_unit(header_path, include_path, profile=profile,
+                                                       precompiled_header=pch_path)
+            includes = [inclusion.include.name for inclusion in translation_unit.get_includes()]
+            self.assertNotIn(str(self._get_header_path('funknown')), includes)
+            self.assertEqual(expected_result, self._convert(translation_unit))
+
+    def test_precompiled_header_missing_include(self):
+        with self.assertRaises(RuntimeError):
+            create_precompiled_header(self._directory / 'base.pch', ['missing.h'], str(self._directory))
+        self.assertEqual([], list(self._directory.iterdir()))
+
+    def test_precompiled_header_path(self):
+        includes = ['test/headers/funknown.h']
+        pch_path = get_precompiled_header_path(self._directory, includes, 'include', ['-std=c++17'])
+        self.assertEqual(self._directory, pch_path.parent)
+        self.assertEqual(pch_path, get_precompiled_header_path(self._directory, includes, 'include', ['-std=c++17']))
+        self.assertNotEqual(pch_path, get_precompiled_header_path(self._directory, includes, 'include', []))
+        self.assertNotEqual(pch_path, get_precompiled_header_path(self._directory, includes, 'other', ['-std=c++17']))
+        self.assertNotEqual(pch_path, get_precompiled_header_path(self._directory, ['test/headers/structs.h'],
+                                                                  'include', ['-std=c++17']))
+
+    def test_token_cache(self):
+        header_path = self._get_header_path('variables')
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        token_cache = get_token_cache(translation_unit)
+        self.assertIs(token_cache, get_token_cache(translation_unit))
+        cursors = [cursor for cursor in translation_unit.cursor.walk_preorder()
+                   if cursor.location.file and cursor.location.file.name == str(header_path)
+                   and cursor.kind.is_expression()]
+        self.assertTrue(cursors)
+        for cursor in cursors:
+            tokens = list(cursor.get_tokens())
+            self.assertEqual([(token.location.offset, token.spelling) for token in tokens],
+                             token_cache.get_cursor_tokens(cursor))
+            extent = cursor.extent
+            expected_spellings = [token.spelling for token in TokenGroup.get_tokens(
+                translation_unit, translation_unit.get_extent(str(header_path),
+                                                              [extent.start.offset, extent.end.offset]))]
+            self.assertEqual(expected_spellings, token_cache.get_extent_spellings(
+                str(header_path), extent.start.offset, extent.end.offset))
+
+    def _assert_token_cache(self, translation_unit, cursors):
+        token_cache = get_token_cache(translation_unit)
+        for cursor in cursors:
+            self.assertEqual([(token.location.offset, token.spelling) for token in cursor.get_tokens()],
+                             token_cache.get_cursor_tokens(cursor))
+            extent = cursor.extent
+            file_name = extent.start.file.name
+            expected_spellings = [token.spelling for token in TokenGroup.get_tokens(
+                translation_unit, translation_unit.get_extent(file_name, [extent.start.offset, extent.end.offset]))]
+            self.assertEqual(expected_spellings, token_cache.get_extent_spellings(
+                file_name, extent.start.offset, extent.end.offset))
+
+    def test_token_cache_unsaved_file(self):
+        header_path = self._directory / 'enums.h'
+        header_path.write_text('enum First { a };\n')
+        unsaved_content = 'enum First { a };\nenum Second { b, c };\n'
+        translation_unit = create_translation_unit(header_path, str(self._directory),
+                                                   unsaved_files=[(str(header_path), unsaved_content)])
+        cursors = [cursor for cursor in translation_unit.cursor.get_children() if cursor.kind.name == 'ENUM_DECL']
+        self.assertEqual(['First', 'Second'], [cursor.spelling for cursor in cursors])
+        self._assert_token_cache(translation_unit, cursors)
+        self.assertEqual(['enum', 'Second', '{', 'b', ',', 'c', '}'], get_token_cache(translation_unit)
+                         .get_extent_spellings(str(header_path), cursors[1].extent.start.offset,
+                                               cursors[1].extent.end.offset))
+
+    def test_token_cache_repeated_inclusion(self):
+        (self._directory / 'part.h').write_text('#ifdef FIRST\nenum First { a };\n#else\n'
+                                                '#define SECOND_VALUES b, c\nenum Second { SECOND_VALUES };\n#endif\n')
+        header_path = self._directory / 'main.h'
+        header_path.write_text('#define FIRST\n#include "part.h"\n#undef FIRST\n#include "part.h"\n')
+        translation_unit = create_translation_unit(header_path, str(self._directory))
+        cursors = [cursor for cursor in translation_unit.cursor.get_children() if cursor.kind.name == 'ENUM_DECL']
+        self.assertEqual(['First', 'Second'], [cursor.spelling for cursor in cursors])
+        self._assert_token_cache(translation_unit, cursors)
@@ -6,11 +6,23 @@
 # or distributed except according to the terms contained in the LICENSE file.
 #-----------------------------------------------------------------------------
 
+import io
 import re
+import shutil
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest import mock
 
-from interface_convert import create_translation_unit, parse_header, generate_conversion, clear_arrays
+from clang.cindex import CursorKind
+
+from clang_helpers import TokenCache
+from data_classes import Interface, Method, Parameter
+
+from interface_convert import create_translation_unit, parse_header, generate_conversion, clear_arrays, \
+    ConversionSession, get_type_converter, get_scope_cache, render_method, get_constant_evaluator, \
+    OutputVariant, output_variants, convert
 
 
 class TestConversion(unittest.TestCase):
@@ -26,6 +38,14 @@ class TestConversion(unittest.TestCase):
         translation_unit.reparse(unsaved_files=[(header_path, '')])
         return result
 
+    @classmethod
+    def _convert_header_in_session(cls, header_name: str) -> str:
+        header_path = (cls._get_headers_directory() / f'{header_name}.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        return session.generate_conversion()
+
     @classmethod
     def _load_expectation(cls, header_name: str) -> str:
         expectation_path = cls._get_headers_directory() / f'{header_name}_expected.h'
@@ -79,3 +99,200 @@ class TestConversion(unittest.TestCase):
         header_name = 'vst_interfaces'
         content_section = self._get_section('Interfaces', '', self._convert_header(header_name))
         self.assertEqual(self._load_expectation(header_name), content_section)
+
+    def test_concurrent_sessions(self):
+        header_names = ['interfaces', 'vst_interfaces', 'structs', 'enums']
+        expected_results = []
+        for header_name in header_names:
+            clear_arrays()
+            expected_results.append(self._convert_header(header_name))
+        with ThreadPoolExecutor(max_workers=len(header_names)) as executor:
+            results = list(executor.map(self._convert_header_in_session, header_names))
+        self.assertEqual(expected_results, results)
+
+    def test_type_conversion_cache(self):
+        header_path = (self._get_headers_directory() / 'interfaces.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        type_converter = get_type_converter(translation_unit)
+        self.assertGreater(type_converter.hits, 0)
+        misses = type_converter.misses
+        session.clear()
+        session.parse_header(translation_unit.cursor)
+        self.assertEqual(misses, type_converter.misses)
+        self.assertEqual(self._load_expectation('interfaces'),
+                         self._get_section('Interfaces', '', session.generate_conversion()))
+
+    def test_scope_cache(self):
+        header_path = (self._get_headers_directory() / 'enums.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        enumerators = {cursor.spelling: cursor for cursor in translation_unit.cursor.walk_preorder()
+                       if cursor.kind == CursorKind.ENUM_CONSTANT_DECL}
+        scope_cache = get_scope_cache(translation_unit)
+        self.assertIs(scope_cache, get_scope_cache(translation_unit))
+        for enumerator in enumerators.values():
+            self.assertEqual(scope_cache.get_lexical_scopes(enumerator.lexical_parent),
+                             scope_cache.get_lexical_scopes(enumerator.lexical_parent))
+        self.assertEqual(('Steinberg', 'IBStream', 'IStreamSeekMode'),
+                         scope_cache.get_lexical_scopes(enumerators['kIBSeekSet'].lexical_parent))
+        self.assertEqual(('Steinberg', 'IBStream'), scope_cache.get_lexical_scopes(enumerators['kURLSize'].lexical_parent))
+        self.assertEqual(('Steinberg', 'Vst', 'MediaTypes'),
+                         scope_cache.get_lexical_scopes(enumerators['kAudio'].lexical_parent))
+
+    def test_write_conversion(self):
+        header_path = (self._get_headers_directory() / 'vst_interfaces.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        writer = io.StringIO()
+        session.write_conversion(writer)
+        self.assertEqual(session.generate_conversion(), writer.getvalue())
+        self.assertEqual(self._load_expectation('vst_interfaces'), self._get_section('Interfaces', '', writer.getvalue()))
+
+    def test_output_variants(self):
+        header_path = (self._get_headers_directory() / 'vst_interfaces.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        full_result = session.generate_conversion(output_variants['full'])
+        self.assertEqual(session.generate_conversion(), full_result)
+        compact_result = session.generate_conversion(output_variants['compact'])
+        self.assertNotIn('Source: ', compact_result)
+        self.assertNotIn('----- Interfaces', compact_result)
+        self.assertIn('struct Steinberg_FUnknownVtbl', compact_result)
+        com_result = session.generate_conversion(output_variants['com'])
+        self.assertNotIn('#if SMTG_COM_COMPATIBLE', com_result)
+        self.assertIn('#define SMTG_COM_COMPATIBLE 1', com_result)
+        self.assertNotIn('#define SMTG_COM_COMPATIBLE 0', com_result)
+        non_com_result = session.generate_conversion(output_variants['non-com'])
+        self.assertIn('#define SMTG_COM_COMPATIBLE 0', non_com_result)
+        self.assertNotIn('__stdcall', non_com_result)
+        self.assertEqual(self._get_section('Interfaces', '', full_result),
+                         self._get_section('Interfaces', '', non_com_result))
+        with self.assertRaises(ValueError):
+            OutputVariant(platform='mac')
+
+    def test_nested_vtables(self):
+        header_path = (self._get_headers_directory() / 'compilation.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        result = session.generate_conversion(output_variants['nested'])
+        self.assertIn('    struct Steinberg_IPluginFactoryVtbl base;\n', result)
+        self.assertIn('SMTG_VTBL_ASSERT(offsetof(struct Steinberg_IPluginFactory2Vtbl, getClassInfo2) == '
+                      'sizeof(struct Steinberg_IPluginFactoryVtbl));\n', result)
+        # interfaces with several direct base classes keep the flat layout
+        self.assertIn('SMTG_VTBL_ASSERT(sizeof(struct Steinberg_Vst_IUnitInfoVtbl) == 7 * sizeof(void (*)(void)));\n',
+                      result)
+
+    def test_convert_without_header_compilation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pluginterfaces_path = Path(directory) / 'pluginterfaces'
+            for name in ['gui/iplugviewcontentscalesupport.h', 'gui/iplugview.h', 'base/ibstream.h']:
+                (pluginterfaces_path / name).parent.mkdir(parents=True, exist_ok=True)
+                (pluginterfaces_path / name).touch()
+            (pluginterfaces_path / 'vst').mkdir()
+            for name in ['types.h', 'funknown.h', 'structs.h', 'interfaces.h', 'vst_interfaces.h']:
+                shutil.copy(self._get_headers_directory() / name, pluginterfaces_path / 'vst' / name)
+            tree = sorted(pluginterfaces_path.rglob('*'))
+            session = convert(pluginterfaces_path)
+            self.assertEqual(tree, sorted(pluginterfaces_path.rglob('*')))
+        header_path = (self._get_headers_directory() / 'compilation.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        file_session = ConversionSession()
+        file_session.parse_header(translation_unit.cursor)
+        self.assertEqual([interface.name for interface in file_session.interfaces],
+                         [interface.name for interface in session.interfaces])
+        self.assertEqual([struct.name for struct in file_session.structs], [struct.name for struct in session.structs])
+
+    def test_finalize_once(self):
+        header_path = (self._get_headers_directory() / 'compilation.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        self.assertEqual(['Steinberg_Vst_IUnitInfo inherits Steinberg_FUnknown through more than one base class'],
+                         session.finalize())
+        with mock.patch.object(Interface, 'finalize') as finalize:
+            self.assertEqual(['Steinberg_Vst_IUnitInfo inherits Steinberg_FUnknown through more than one base class'],
+                             session.finalize())
+            for name in ['full', 'nested']:
+                session.generate_conversion(output_variants[name])
+        finalize.assert_not_called()
+
+    def test_render_method(self):
+        method = Method('queryInterface', 'Steinberg_tresult', [Parameter('const Steinberg_TUID', 'iid'),
+                                                                 Parameter('void**', 'obj')])
+        self.assertEqual('Steinberg_tresult (SMTG_STDMETHODCALLTYPE* queryInterface) (void* thisInterface, '
+                         'const Steinberg_TUID iid, void** obj);', render_method(method))
+        self.assertEqual('Steinberg_uint32 (SMTG_STDMETHODCALLTYPE* addRef) (void* thisInterface);',
+                         render_method(Method('addRef', 'Steinberg_uint32', [])))
+
+    def _convert_enums_in_session(self, header_path: Path, enum_mode: str, unsaved_files=None) -> str:
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]),
+                                                   unsaved_files=unsaved_files)
+        session = ConversionSession(enum_mode=enum_mode)
+        session.parse_header(translation_unit.cursor)
+        return self._get_section('Enums', 'Variable declarations', session.generate_conversion())
+
+    def test_enum_values(self):
+        header_path = (self._get_headers_directory() / 'enums.h').absolute()
+        content_section = self._convert_enums_in_session(header_path, 'value')
+        self.assertIn('Steinberg_IBStream_IStreamSeekMode_kIBSeekCur = 1,', content_section)
+        self.assertIn('Steinberg_Vst_IAutomationState_AutomationStates_kWriteState = 2,', content_section)
+        self.assertIn('Steinberg_Vst_IAutomationState_AutomationStates_kReadWriteState = 3', content_section)
+
+    def test_enum_value_fallback(self):
+        header_path = (self._get_headers_directory() / 'enum_sizes.h').absolute()
+        source = 'namespace Steinberg {\nenum Sizes\n{\n\tkIntSize = sizeof (int),\n\tkTwice = kIntSize * 2\n};\n}\n'
+        content_section = self._convert_enums_in_session(header_path, 'expression', [(str(header_path), source)])
+        self.assertIn('Steinberg_Sizes_kIntSize = 4,', content_section)
+        self.assertIn('Steinberg_Sizes_kTwice = Steinberg_Sizes_kIntSize * 2', content_section)
+
+    def test_constant_evaluator_extent_fallback(self):
+        header_path = (self._get_headers_directory() / 'operands.h').absolute()
+        source = ('namespace Steinberg {\n'
+                  'typedef int int32;\n'
+                  'static const int32 kNegative = -0x42;\n'
+                  'static const int32 kInverted = ~1;\n'
+                  '}\n')
+        get_cursor_tokens = TokenCache.get_cursor_tokens
+
+        def get_operand_tokens(token_cache, cursor):
+            if cursor.kind in [CursorKind.UNARY_OPERATOR, CursorKind.INTEGER_LITERAL]:
+                return []
+            return get_cursor_tokens(token_cache, cursor)
+
+        # operators and literals without tokens of their own are converted from the spellings of their extent
+        with mock.patch.object(TokenCache, 'get_cursor_tokens', get_operand_tokens):
+            translation_unit = create_translation_unit(header_path, str(header_path.parents[2]),
+                                                       unsaved_files=[(str(header_path), source)])
+            session = ConversionSession()
+            session.parse_header(translation_unit.cursor)
+        self.assertEqual(['static const Steinberg_int32 Steinberg_kNegative = -0x42;',
+                          'static const Steinberg_int32 Steinberg_kInverted = ~1;'],
+                         [str(variable) for variable in session.variables])
+
+    def test_constant_evaluator(self):
+        header_path = (self._get_headers_directory() / 'constants.h').absolute()
+        source = ('namespace Steinberg {\n'
+                  'typedef int int32;\n'
+                  'static const int32 kBase = 1 << 4;\n'
+                  'static const int32 kDerived = kBase | 1;\n'
+                  'static const int32 kTwice = kDerived + kDerived;\n'
+                  'static const int32 kSize = sizeof (int32);\n'
+                  'static const int32 kLoop = kLoop;\n'
+                  '}\n')
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]),
+                                                   unsaved_files=[(str(header_path), source)])
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        self.assertEqual(['static const Steinberg_int32 Steinberg_kBase = 1 << 4;',
+                          'static const Steinberg_int32 Steinberg_kDerived = 1 << 4 | 1;',
+                          'static const Steinberg_int32 Steinberg_kTwice = 1 << 4 | 1 + 1 << 4 | 1;'],
+                         [str(variable) for variable in session.variables])
+        self.assertEqual([('Steinberg_kSize', 'unsupported CXX_UNARY_EXPR'), ('Steinberg_kLoop', 'cyclic definition')],
+                         session.skipped_variables)
+        self.assertEqual(['1 variables skipped, cyclic definition', '1 variables skipped, unsupported CXX_UNARY_EXPR'],
+                         session.finalize())
+        self.assertGreater(get_constant_evaluator(translation_unit).hits, 0)
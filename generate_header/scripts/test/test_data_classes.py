@@ -0,0 +1,123 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import pickle
+import unittest
+
+import data_classes
+from data_classes import Container, Enum, Interface, Method, Parameter
+
+
+class TestContainer(unittest.TestCase):
+    @staticmethod
+    def _create_container(*names: str) -> Container:
+        return Container(Enum(name, '') for name in names)
+
+    def test_lookup(self):
+        container = self._create_container('a', 'b', 'c')
+        self.assertIn('b', container)
+        self.assertNotIn('d', container)
+        self.assertEqual('c', container['c'].name)
+        self.assertIsNone(container['d'])
+        self.assertEqual('a', container[0].name)
+        self.assertEqual(['b', 'c'], [element.name for element in container[1:]])
+
+    def test_duplicates_resolve_to_first(self):
+        container = self._create_container('a', 'b')
+        first = container['a']
+        container.append(Enum('a', ''))
+        self.assertEqual(3, len(container))
+        self.assertIs(first, container['a'])
+        del container[0]
+        self.assertIs(container[1], container['a'])
+
+    def test_mutations_keep_index(self):
+        container = self._create_container('a', 'b', 'c')
+        container.insert(0, Enum('d', ''))
+        container.remove(container['b'])
+        self.assertEqual('a', container.pop(1).name)
+        container[0] = Enum('e', '')
+        self.assertEqual(['e', 'c'], [element.name for element in container])
+        self.assertNotIn('a', container)
+        self.assertNotIn('d', container)
+        self.assertIn('e', container)
+        container.clear()
+        self.assertNotIn('e', container)
+
+    def test_pickle(self):
+        container = pickle.loads(pickle.dumps(self._create_container('a', 'b')))
+        self.assertIsInstance(container, Container)
+        self.assertEqual('b', container['b'].name)
+
+    def test_many_elements(self):
+        names = [f'name{index}' for index in range(20000)]
+        container = self._create_container(*names)
+        for name in names:
+            self.assertIs(name, container[name].name)
+
+
+class TestInterface(unittest.TestCase):
+    @staticmethod
+    def _create_interface(name: str, *base_classes: Interface) -> Interface:
+        interface = Interface(name, '', '')
+        for base_class in base_classes:
+            interface.add_base_class(base_class)
+        return interface
+
+    def test_linearization(self):
+        unknown = self._create_interface('FUnknown')
+        plugin_base = self._create_interface('IPluginBase', unknown)
+        component = self._create_interface('IComponent', plugin_base)
+        self.assertEqual((unknown, plugin_base), component.base_classes)
+        self.assertIs(component.base_classes, component.base_classes)
+        self.assertFalse(component.diamond_bases)
+        self.assertFalse(component.duplicate_bases)
+
+    def test_add_base_class_invalidates(self):
+        unknown = self._create_interface('FUnknown')
+        plugin_base = self._create_interface('IPluginBase')
+        component = self._create_interface('IComponent', plugin_base)
+        self.assertEqual((plugin_base,), component.base_classes)
+        plugin_base.add_base_class(unknown)
+        self.assertEqual((unknown, plugin_base), component.base_classes)
+
+    def test_diamond_and_duplicate_bases(self):
+        unknown = self._create_interface('FUnknown')
+        left = self._create_interface('ILeft', unknown)
+        right = self._create_interface('IRight', unknown)
+        derived = self._create_interface('IDerived', left, right, left)
+        self.assertEqual((unknown, left, right), derived.base_classes)
+        self.assertEqual((unknown,), derived.diamond_bases)
+        self.assertEqual((left,), derived.duplicate_bases)
+
+
+class TestMethod(unittest.TestCase):
+    def test_shared_parameters(self):
+        first_method = Method('first', 'void', [Parameter('Steinberg_int32', 'index')])
+        second_method = Method('second', 'void', [Parameter('Steinberg_int32', 'index')])
+        self.assertIs(first_method.parameters, second_method.parameters)
+        self.assertIs(Parameter('Steinberg_int32', 'index'), pickle.loads(pickle.dumps(first_method.parameters[0])))
+        self.assertIs(first_method.parameters, pickle.loads(pickle.dumps(second_method)).parameters)
+
+    def test_shared_parameters_are_released(self):
+        parameter_key = ('Steinberg_released', 'released')
+        method = Method('released', 'void', [Parameter(*parameter_key)])
+        self.assertIn(parameter_key, Parameter._instances)
+        parameters = method.parameters
+        self.assertIn(parameters, data_classes._parameter_lists)
+        del method
+        self.assertNotIn(parameters, data_classes._parameter_lists)
+        del parameters
+        self.assertNotIn(parameter_key, Parameter._instances)
+
+    def test_dict_round_trip(self):
+        method = Method('getBusInfo', 'Steinberg_tresult', [Parameter('Steinberg_int32', 'index')])
+        loaded_method = Method.from_dict(method.to_dict())
+        self.assertEqual((method.name, method.return_type, method.parameters, method.is_const),
+                         (loaded_method.name, loaded_method.return_type, loaded_method.parameters,
+                          loaded_method.is_const))
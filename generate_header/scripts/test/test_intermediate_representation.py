@@ -0,0 +1,40 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import io
+import json
+import unittest
+from pathlib import Path
+
+from interface_convert import create_translation_unit, ConversionSession
+from intermediate_representation import dump_ir, load_ir
+
+
+class TestIntermediateRepresentation(unittest.TestCase):
+    @staticmethod
+    def _parse_header(header_name: str) -> ConversionSession:
+        header_path = (Path(__file__).parent / 'headers' / f'{header_name}.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        return session
+
+    def test_round_trip(self):
+        for header_name in ['compilation', 'variables', 'enums', 'typedefs']:
+            session = self._parse_header(header_name)
+            ir_file = io.StringIO()
+            dump_ir(session, ir_file)
+            ir_file.seek(0)
+            loaded_session = ConversionSession()
+            load_ir(loaded_session, ir_file)
+            self.assertEqual(session.generate_conversion(), loaded_session.generate_conversion())
+
+    def test_unsupported_version(self):
+        ir_file = io.StringIO(json.dumps({'format': 'vst3_c_api_ir', 'version': 0, 'files': []}))
+        with self.assertRaises(ValueError):
+            load_ir(ConversionSession(), ir_file)
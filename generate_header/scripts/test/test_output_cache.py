@@ -0,0 +1,128 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from typing import List, Tuple
+from unittest import mock
+
+from generate_header_compilation import get_creation_date, _generate_header
+from interface_convert import main
+from output_cache import OutputCache, write_if_changed, get_sidecar_path
+from parse_cache import hash_dependencies
+
+
+class TestOutputCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def test_write_if_changed(self):
+        output_path = self._directory / 'vst3_c_api.h'
+        self.assertTrue(write_if_changed(output_path, lambda writer: writer.write('content\n')))
+        os.utime(output_path, ns=(0, 0))
+        self.assertFalse(write_if_changed(output_path, lambda writer: writer.write('content\n')))
+        self.assertEqual(0, output_path.stat().st_mtime_ns)
+        self.assertEqual('{}  vst3_c_api.h\n'.format(hashlib.sha256(b'content\n').hexdigest()),
+                         get_sidecar_path(output_path).read_text())
+        self.assertTrue(write_if_changed(output_path, lambda writer: writer.write('changed\n')))
+        self.assertEqual('changed\n', output_path.read_text())
+        self.assertEqual(['vst3_c_api.h', 'vst3_c_api.h.sha256'], sorted(path.name for path in
+                                                                          self._directory.iterdir()))
+
+    def test_restore(self):
+        output_directory = self._directory / 'output'
+        (output_directory / 'vst').mkdir(parents=True)
+        output_paths = [output_directory / 'vst3_c_api.h', output_directory / 'vst' / 'ivstcomponent_c.h']
+        for output_path in output_paths:
+            output_path.write_text(output_path.name)
+        cache = OutputCache(self._directory / 'cache')
+        header_content = '#include "pluginterfaces/vst/ivstcomponent.h"\n'
+        key = cache.get_key(header_content, ['-std=c++17'], ['expression'])
+        self.assertIsNone(cache.restore(key, self._directory / 'restored'))
+        dependency_path = self._directory / 'ivstcomponent.h'
+        dependency_path.write_text('class IComponent;\n')
+        cache.store(key, output_directory, output_paths, hash_dependencies([str(dependency_path)]),
+                    'console output\n')
+        console = StringIO()
+        restored_paths = cache.restore(key, self._directory / 'restored', console)
+        self.assertEqual('console output\n', console.getvalue())
+        self.assertEqual([self._directory / 'restored' / output_path.relative_to(output_directory)
+                          for output_path in output_paths], restored_paths)
+        self.assertEqual([output_path.read_text() for output_path in output_paths],
+                         [restored_path.read_text() for restored_path in restored_paths])
+        self.assertNotEqual(key, cache.get_key(header_content, ['-std=c++17'], ['value']))
+        self.assertNotEqual(key, cache.get_key(header_content, [], ['expression']))
+        self.assertNotEqual(key, cache.get_key('#include "pluginterfaces/vst/ivstaudioprocessor.h"\n',
+                                               ['-std=c++17'], ['expression']))
+        dependency_path.write_text('class IComponent {};\n')
+        self.assertIsNone(cache.restore(key, self._directory / 'restored'))
+
+    @staticmethod
+    def _run_main(arguments: List[str]) -> Tuple[str, str]:
+        """runs the conversion with the given command line arguments, returns its stdout and stderr"""
+        console, errors = StringIO(), StringIO()
+        with mock.patch.object(sys, 'argv', ['interface_convert.py'] + arguments), redirect_stdout(console), \
+                redirect_stderr(errors):
+            main()
+        return console.getvalue(), errors.getvalue()
+
+    def test_main_detects_changed_includes(self):
+        headers_path = self._directory / 'root' / 'test' / 'headers'
+        shutil.copytree(Path(__file__).parent / 'headers', headers_path)
+        output_path = self._directory / 'vst3_c_api.h'
+        included_path = headers_path / 'interfaces.h'
+        working_directory = os.getcwd()
+        os.chdir(self._directory)
+        try:
+            for options in [[], ['--jobs', '1']]:
+                arguments = ['--output-cache', str(self._directory / 'cache')] + options + \
+                            [str(headers_path / 'compilation.h')]
+                included_path.write_text(included_path.read_text().replace('getInfo', 'getFactoryInfo'))
+                console_output, errors = self._run_main(arguments)
+                self.assertNotIn('Output cache: restored', errors)
+                self.assertIn('getFactoryInfo', output_path.read_text())
+                restored_console_output, errors = self._run_main(arguments)
+                self.assertIn('Output cache: restored 1 files', errors)
+                self.assertEqual(console_output, restored_console_output)
+                included_path.write_text(included_path.read_text().replace('getFactoryInfo', 'getInfo'))
+                console_output, errors = self._run_main(arguments)
+                self.assertNotIn('Output cache: restored', errors)
+                self.assertNotIn('getFactoryInfo', output_path.read_text())
+                self.assertIn('getInfo', output_path.read_text())
+                self.assertNotIn('getFactoryInfo', console_output)
+        finally:
+            os.chdir(working_directory)
+
+    def test_deterministic_header_compilation(self):
+        self.assertEqual(date(2024, 3, 5), get_creation_date(date(2024, 3, 5)))
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1709600000'}):
+            self.assertEqual(date(2024, 3, 5), get_creation_date())
+        pluginterfaces_path = self._directory / 'pluginterfaces'
+        (pluginterfaces_path / 'vst').mkdir(parents=True)
+        for name in ['ivstcomponent.h', 'ivstaudioprocessor.h', 'ivsttestplugprovider.h']:
+            (pluginterfaces_path / 'vst' / name).touch()
+        result_path = pluginterfaces_path / 'vst' / 'header_compilation.h'
+        content = _generate_header(pluginterfaces_path, result_path, date(2024, 3, 5))
+        self.assertIn('Created by  : Steinberg, 03/2024', content)
+        self.assertIn('#include "pluginterfaces/vst/ivstaudioprocessor.h"\n'
+                      '#include "pluginterfaces/vst/ivstcomponent.h"\n', content)
+        self.assertNotIn('ivsttestplugprovider.h', content)
+        os.utime(result_path, ns=(0, 0))
+        self.assertEqual(content, _generate_header(pluginterfaces_path, result_path, date(2024, 3, 5)))
+        self.assertEqual(0, result_path.stat().st_mtime_ns)
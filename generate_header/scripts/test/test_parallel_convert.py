@@ -0,0 +1,30 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import unittest
+from pathlib import Path
+
+from interface_convert import create_translation_unit, ConversionSession
+from parallel_convert import parse_header_parallel
+
+
+class TestParallelConvert(unittest.TestCase):
+    @staticmethod
+    def _get_header_path() -> Path:
+        return (Path(__file__).parent / 'headers' / 'compilation.h').absolute()
+
+    def test_output_matches_serial_conversion(self):
+        header_path = self._get_header_path()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        session = ConversionSession()
+        session.parse_header(translation_unit.cursor)
+        expected_result = session.generate_conversion()
+        for group_size in [1, 2]:
+            parallel_session = parse_header_parallel(header_path, str(header_path.parents[2]), jobs=2,
+                                                     group_size=group_size)
+            self.assertEqual(expected_result, parallel_session.generate_conversion())
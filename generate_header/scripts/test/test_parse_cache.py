@@ -0,0 +1,72 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from parallel_convert import parse_header_parallel
+from parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self._directory = Path(tempfile.mkdtemp())
+        self._headers_path = self._directory / 'root' / 'test' / 'headers'
+        shutil.copytree(Path(__file__).parent / 'headers', self._headers_path)
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _convert(self, cache: ParseCache) -> str:
+        header_path = self._headers_path / 'compilation.h'
+        return parse_header_parallel(header_path, str(header_path.parents[2]), jobs=1, cache=cache)\
+            .generate_conversion()
+
+    def test_reuses_unchanged_groups(self):
+        cache_path = self._directory / 'cache'
+        uncached_result = self._convert(None)
+        cache = ParseCache(cache_path)
+        self.assertEqual(uncached_result, self._convert(cache))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+        cache = ParseCache(cache_path)
+        self.assertEqual(uncached_result, self._convert(cache))
+        self.assertEqual((2, 0), (cache.hits, cache.misses))
+
+        header_path = self._headers_path / 'vst_interfaces.h'
+        header_path.write_text(header_path.read_text().replace('notifyUnitByBusChange', 'notifyUnitChange'))
+        cache = ParseCache(cache_path)
+        result = self._convert(cache)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertIn('notifyUnitChange', result)
+        self.assertEqual(self._convert(None), result)
+
+    def test_malformed_entries_are_misses(self):
+        cache_path = self._directory / 'cache'
+        uncached_result = self._convert(None)
+        self._convert(ParseCache(cache_path))
+        entry_paths = sorted(cache_path.iterdir())
+        self.assertEqual(2, len(entry_paths))
+        entry = json.loads(entry_paths[0].read_text())
+        entry['version'] = 1
+        entry_paths[0].write_text(json.dumps(entry))
+        entry = json.loads(entry_paths[1].read_text())
+        del entry['records'][0]['interfaces']
+        entry_paths[1].write_text(json.dumps(entry))
+        cache = ParseCache(cache_path)
+        self.assertEqual(uncached_result, self._convert(cache))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+        entry_paths[0].write_text('{"dependencies": {}}')
+        entry_paths[1].write_text('[]')
+        cache = ParseCache(cache_path)
+        self.assertEqual(uncached_result, self._convert(cache))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
@@ -0,0 +1,68 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import io
+import json
+import unittest
+from pathlib import Path
+
+from clang.cindex import Cursor
+# noinspection PyProtectedMember
+from clang.cindex import TokenGroup as TGroup
+
+from interface_convert import create_translation_unit, ConversionSession
+from profile_convert import ConversionProfiler
+
+
+class TestProfileConvert(unittest.TestCase):
+    def setUp(self):
+        header_path = (Path(__file__).parent / 'headers' / 'compilation.h').absolute()
+        self._translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+
+    def test_instrument(self):
+        functions = [Cursor.__dict__['get_children'], Cursor.__dict__['get_definition'], TGroup.__dict__['get_tokens']]
+        profiler = ConversionProfiler(3)
+        session = ConversionSession()
+        with profiler.phase('parse_header'), profiler.instrument(session):
+            session.parse_header(self._translation_unit.cursor)
+        # parsed afterwards, as the token cache of the translation unit would save the instrumented parse any tokenizing
+        expected_result = ConversionSession()
+        expected_result.parse_header(self._translation_unit.cursor)
+        self.assertEqual(expected_result.generate_conversion(), session.generate_conversion())
+        self.assertEqual(functions, [Cursor.__dict__['get_children'], Cursor.__dict__['get_definition'],
+                                     TGroup.__dict__['get_tokens']])
+        self.assertNotIn('_parse_namespace_children', session.__dict__)
+
+        report = json.loads(json.dumps(profiler.report()))
+        self.assertEqual(['parse_header'], list(report['phases']))
+        self.assertGreater(report['phases']['parse_header']['wall_seconds'], 0)
+        # forward declarations are handled as well, but not converted
+        self.assertGreaterEqual(report['cursor_kinds']['CLASS_DECL'], len(session.interfaces))
+        self.assertEqual(sum(len(interface.methods) for interface in session.interfaces),
+                         report['cursor_kinds']['CXX_METHOD'])
+        self.assertGreater(report['cursor_kinds']['NAMESPACE'], 0)
+        for name in ['get_children', 'get_definition', 'get_tokens']:
+            self.assertGreater(report['libclang_calls'][name], 0)
+        slowest_declarations = report['slowest_declarations']
+        self.assertEqual(3, len(slowest_declarations))
+        self.assertEqual(sorted(slowest_declarations, key=lambda declaration: -declaration['seconds']),
+                         slowest_declarations)
+        self.assertTrue(slowest_declarations[0]['name'].startswith('Steinberg::'))
+        self.assertRegex(slowest_declarations[0]['location'], r'\.h:\d+$')
+
+    def test_phases_add_up(self):
+        profiler = ConversionProfiler()
+        for _ in range(2):
+            with profiler.phase('write_conversion'):
+                pass
+        writer = io.StringIO()
+        profiler.write_report(writer)
+        report = json.loads(writer.getvalue())
+        self.assertEqual(['write_conversion'], list(report['phases']))
+        self.assertEqual({}, report['cursor_kinds'])
+        self.assertEqual([], report['slowest_declarations'])
@@ -0,0 +1,71 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clang.cindex import Diagnostic
+
+from clang_helpers import get_shared_index
+from interface_convert import create_translation_unit, ConversionSession
+from split_convert import write_split, get_split_header_name
+
+
+class TestSplitConvert(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        header_path = (Path(__file__).parent / 'headers' / 'compilation.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        cls._session = ConversionSession()
+        cls._session.parse_header(translation_unit.cursor)
+
+    def setUp(self):
+        self._directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    @staticmethod
+    def _get_errors(header_path: Path) -> list:
+        translation_unit = get_shared_index().parse(str(header_path), ['-x', 'c', '-std=c11'])
+        return [diagnostic.spelling for diagnostic in translation_unit.diagnostics
+                if diagnostic.severity >= Diagnostic.Error]
+
+    def test_split_header_name(self):
+        self.assertEqual('vst/ivstaudioprocessor_c.h',
+                         get_split_header_name('pluginterfaces/vst/ivstaudioprocessor.h'))
+        self.assertEqual('funknown_c.h', get_split_header_name('funknown.h'))
+
+    def test_headers_compile_on_their_own(self):
+        output_paths = write_split(self._session, self._directory)
+        self.assertEqual(['vst3_c_api_base.h', 'headers/types_c.h', 'headers/funknown_c.h', 'headers/structs_c.h',
+                          'headers/interfaces_c.h', 'headers/vst_interfaces_c.h', 'vst3_c_api.h'],
+                         [output_path.relative_to(self._directory).as_posix() for output_path in output_paths])
+        for output_path in output_paths:
+            self.assertEqual([], self._get_errors(output_path), output_path)
+
+    def test_includes(self):
+        write_split(self._session, self._directory)
+        interfaces_content = (self._directory / 'headers' / 'interfaces_c.h').read_text()
+        self.assertIn('#include "../vst3_c_api_base.h"\n#include "types_c.h"\n#include "funknown_c.h"\n',
+                      interfaces_content)
+        # structs which are only referred to by pointer are forward declared instead of included
+        self.assertNotIn('#include "structs_c.h"', interfaces_content)
+        self.assertIn('struct Steinberg_PFactoryInfo;\n', interfaces_content)
+        self.assertIn('Steinberg_kResultOk', (self._directory / 'headers' / 'types_c.h').read_text())
+        self.assertNotIn('Steinberg_kResultOk', (self._directory / 'vst3_c_api_base.h').read_text())
+
+    def test_same_elements_as_single_header(self):
+        write_split(self._session, self._directory)
+        split_content = ''.join(header_path.read_text() for header_path in sorted(self._directory.rglob('*.h')))
+        single_content = self._session.generate_conversion()
+        for element in self._session.interfaces + self._session.structs + self._session.enums:
+            self.assertEqual(1, single_content.count(element.source_location + ' */'))
+            self.assertEqual(1, split_content.count(element.source_location + ' */'))
@@ -0,0 +1,59 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import unittest
+from pathlib import Path
+
+from interface_convert import create_translation_unit, ConversionSession
+from subset_convert import create_subset, find_referenced_names
+
+
+class TestSubsetConvert(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        header_path = (Path(__file__).parent / 'headers' / 'compilation.h').absolute()
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        cls._session = ConversionSession()
+        cls._session.parse_header(translation_unit.cursor)
+
+    @staticmethod
+    def _get_names(elements) -> list:
+        return [element.name for element in elements]
+
+    def test_dependency_closure(self):
+        subset_session = create_subset(self._session, ['IPluginFactory2'])
+        self.assertEqual(['Steinberg_FUnknown', 'Steinberg_IPluginFactory', 'Steinberg_IPluginFactory2'],
+                         self._get_names(subset_session.interfaces))
+        self.assertEqual(['Steinberg_PFactoryInfo'], self._get_names(subset_session.structs))
+        self.assertEqual(['Steinberg_PFactoryInfo'], self._get_names(subset_session.unions))
+        self.assertIn('Steinberg_TUID[16]', self._get_names(subset_session.typedefs))
+        self.assertIn('Steinberg_FIDString', self._get_names(subset_session.typedefs))
+        self.assertFalse(subset_session.enums)
+
+    def test_model_order(self):
+        subset_session = create_subset(self._session, ['Steinberg_Vst_IUnitInfo', 'IPluginFactory'])
+        for name in ['interfaces', 'structs', 'enums', 'typedefs', 'variables']:
+            full_names = self._get_names(getattr(self._session, name))
+            subset_names = self._get_names(getattr(subset_session, name))
+            self.assertEqual([element_name for element_name in full_names if element_name in subset_names],
+                             subset_names)
+        self.assertIn('Steinberg_Vst_MediaTypes', self._get_names(subset_session.enums))
+
+    def test_full_selection(self):
+        selection = [interface.name for interface in self._session.interfaces]
+        self.assertEqual(self._session.generate_conversion().count('struct '),
+                         create_subset(self._session, selection).generate_conversion().count('struct '))
+
+    def test_unknown_selection(self):
+        with self.assertRaises(ValueError):
+            create_subset(self._session, ['IUnknownInterface'])
+
+    def test_referenced_names(self):
+        source = 'const struct Steinberg_IPluginFactory2Vtbl* vtbl; compare_iid (Steinberg_FUnknown_iid, iid);'
+        self.assertEqual(['Steinberg_FUnknown', 'Steinberg_IPluginFactory2'],
+                         find_referenced_names(self._session, source))
@@ -0,0 +1,70 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from clang_helpers import create_translation_unit, invalidate_caches
+from interface_convert import ConversionSession, get_type_converter, get_constant_evaluator, \
+    get_scope_cache
+from watch_convert import HeaderWatcher
+
+
+class TestHeaderWatcher(unittest.TestCase):
+    def setUp(self):
+        self._directory = Path(tempfile.mkdtemp())
+        self._headers_path = self._directory / 'root' / 'test' / 'headers'
+        shutil.copytree(Path(__file__).parent / 'headers', self._headers_path)
+
+    def tearDown(self):
+        shutil.rmtree(self._directory)
+
+    def _modify(self, header_path: Path, old: str, new: str):
+        header_path.write_text(header_path.read_text().replace(old, new))
+        stat = header_path.stat()
+        os.utime(header_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def test_regenerates_on_change(self):
+        header_path = self._headers_path / 'interfaces.h'
+        watcher = HeaderWatcher(header_path, str(header_path.parents[2]))
+        self.assertIn(str(self._headers_path / 'funknown.h'), watcher.watched_files)
+        self.assertFalse(watcher.update())
+        self.assertIn('addRef', watcher.generate())
+
+        included_path = self._headers_path / 'funknown.h'
+        self._modify(included_path, 'addRef', 'addReference')
+        self.assertEqual([str(included_path)], watcher.get_changed_files())
+        self.assertTrue(watcher.update())
+        self.assertFalse(watcher.update())
+        result = watcher.generate()
+        self.assertIn('addReference', result)
+        self.assertNotIn('addRef)', result)
+
+    def test_reevaluates_dependent_constants(self):
+        header_path = self._headers_path / 'variables.h'
+        watcher = HeaderWatcher(header_path, str(header_path.parents[2]))
+        self.assertIn('Steinberg_kMinInt32 = (-0x42 - 1);', watcher.generate())
+        self._modify(header_path, 'kMinLong = (-0x42-1)', 'kMinLong = (-0x99-1)')
+        self.assertTrue(watcher.update())
+        result = watcher.generate()
+        self.assertIn('Steinberg_kMinLong = (-0x99 - 1);', result)
+        self.assertIn('Steinberg_kMinInt32 = (-0x99 - 1);', result)
+
+    def test_invalidates_translation_unit_caches(self):
+        header_path = self._headers_path / 'interfaces.h'
+        translation_unit = create_translation_unit(header_path, str(header_path.parents[2]))
+        ConversionSession().parse_header(translation_unit.cursor)
+        caches = [get_type_converter(translation_unit), get_constant_evaluator(translation_unit),
+                  get_scope_cache(translation_unit)]
+        invalidate_caches(translation_unit)
+        self.assertIsNot(caches[0], get_type_converter(translation_unit))
+        self.assertIsNot(caches[1], get_constant_evaluator(translation_unit))
+        self.assertIsNot(caches[2], get_scope_cache(translation_unit))
@@ -0,0 +1,98 @@
+#-----------------------------------------------------------------------------
+# This file is part of a Steinberg SDK. It is subject to the license terms
+# in the LICENSE file found in the top-level directory of this distribution
+# and at www.steinberg.net/sdklicenses.
+# No part of the SDK, including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+#-----------------------------------------------------------------------------
+
+"""
+Watch mode of the conversion.
+
+The index and translation unit are kept alive between conversions. The watched files, that is the header and
+all files it includes, are polled for modifications by their stat information, which needs neither additional
+packages nor services. On a change, the translation unit is reparsed with the contents of the changed files
+handed over as unsaved files, and the converted header is regenerated.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+
+from clang_helpers import create_translation_unit, reparse_translation_unit
+from interface_convert import ConversionSession, print_warnings
+from output_cache import write_if_changed
+
+
+class HeaderWatcher:
+    def __init__(self, header_path: Path, include_path: str, clang_args: List[str] = None,
+                 profile: str = 'default', blocklist: List[str] = None, enum_mode: str = 'expression'):
+        self._profile = profile
+        self._blocklist = blocklist
+        self._enum_mode = enum_mode
+        self._translation_unit = create_translation_unit(header_path, include_path, clang_args, profile=profile)
+        self._file_states = self._get_file_states()
+
+    @property
+    def watched_files(self) -> List[str]:
+        return list(self._file_states)
+
+    def _get_file_states(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        files = [self._translation_unit.spelling]
+        files.extend(inclusion.include.name for inclusion in self._translation_unit.get_includes())
+        return {file: self._get_file_state(file) for file in files}
+
+    @staticmethod
+    def _get_file_state(file: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_changed_files(self) -> List[str]:
+        """returns all watched files whose stat information differs from the last parse"""
+        return [file for file, state in self._file_states.items() if self._get_file_state(file) != state]
+
+    def _parse(self) -> ConversionSession:
+        session = ConversionSession(self._blocklist, self._enum_mode)
+        session.parse_header(self._translation_unit.cursor)
+        print_warnings(session.finalize())
+        return session
+
+    def generate(self) -> str:
+        """converts the current state of the translation unit"""
+        return self._parse().generate_conversion()
+
+    def update(self) -> bool:
+        """reparses the translation unit if any watched file changed, returns whether it did"""
+        changed_files = self.get_changed_files()
+        if not changed_files:
+            return False
+        unsaved_files = []
+        for file in changed_files:
+            try:
+                with open(file) as changed_file:
+                    unsaved_files.append((file, changed_file.read()))
+            except OSError:
+                continue
+        reparse_translation_unit(self._translation_unit, unsaved_files, self._profile)
+        self._file_states = self._get_file_states()
+        return True
+
+    def _write(self, output_path: Path, start_time: float):
+        session = self._parse()
+        write_if_changed(output_path, session.write_conversion)
+        print('Generated {} in {:.3f}s, watching {} files'.format(output_path, time.perf_counter() - start_time,
+                                                                  len(self._file_states)), file=sys.stderr)
+
+    def run(self, output_path: Path, interval: float = 0.2):
+        """writes the converted header and regenerates it on every change until interrupted"""
+        self._write(output_path, time.perf_counter())
+        while True:
+            time.sleep(interval)
+            start_time = time.perf_counter()
+            if self.update():
+                self._write(output_path, start_time)